@@ -0,0 +1,248 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+"""Align each slide to the time range of the video where it is discussed.
+
+Scores every slide's extracted text against sliding windows of the transcript
+(and, if available, descriptions of captured video frames) by IDF-weighted
+token overlap, then picks the best assignment with a monotonic dynamic
+program: slides are presented in order, so their windows never go backwards.
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "extract-transcript"))
+from transcript_index import TranscriptIndex, format_timestamp, parse_timestamp  # noqa: E402
+
+WORD = re.compile(r"[a-z0-9][a-z0-9'+#.-]*[a-z0-9+#]|[a-z0-9]")
+SAME_AS_PREVIOUS = "(same as previous)"
+# Shortest time range given to a slide, so each one has some transcript of its own
+MIN_SLIDE_SECONDS = 10.0
+STOPWORDS = frozenset(
+    """
+    a about after all also an and any are as at be because been but by can could did do does
+    for from had has have how i if in into is it its just like more most my no not of on one
+    or our out so some such than that the their them then there these they this to up us use
+    using was we what when where which while who why will with would you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase content words, with a light plural strip so "agents" matches "agent"."""
+    tokens = []
+    for word in WORD.findall(text.lower()):
+        if len(word) < 3 or word in STOPWORDS:
+            continue
+        if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def load_slides(path: Path) -> list[str]:
+    """Read each slide's text from slide_ascii.json, or from slide_ascii.md if that is all there is."""
+    if path.suffix == ".json":
+        return [slide["text"] for slide in json.loads(path.read_text())["slides"]]
+    slides = []
+    for section in re.split(r"^## Slide \d+\s*$", path.read_text(), flags=re.MULTILINE)[1:]:
+        match = re.search(r"```\n(.*?)\n```", section, re.DOTALL)
+        text = match.group(1) if match else ""
+        slides.append("" if text == "(no extractable text)" else text)
+    return slides
+
+
+def load_frames(manifest_path: Path) -> list[tuple[float, str]]:
+    """Read (seconds, description) pairs from a frames_manifest.md.
+
+    "(same as previous)" rows take the description of the frame before them,
+    since the same slide is still on screen.
+    """
+    frames = []
+    previous = ""
+    for line in manifest_path.read_text().splitlines():
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if len(cells) < 3 or not re.fullmatch(r"\[[\d:]+\]", cells[1]):
+            continue
+        description = previous if cells[2] == SAME_AS_PREVIOUS else cells[2]
+        if description:
+            frames.append((parse_timestamp(cells[1]), description))
+        previous = description
+    return frames
+
+
+def overlap_scores(slide_tokens: list[Counter], window_tokens: list[Counter], idf: dict[str, float]) -> list[list[float]]:
+    """Fraction of each slide's IDF weight that appears in each window."""
+    scores = []
+    for tokens in slide_tokens:
+        total = sum(idf[t] for t in tokens)
+        if not total:
+            scores.append([0.0] * len(window_tokens))
+            continue
+        scores.append([sum(idf[t] for t in tokens if t in window) / total for window in window_tokens])
+    return scores
+
+
+def monotonic_path(scores: list[list[float]]) -> list[int]:
+    """Choose one window per slide, never earlier than the previous slide's, maximizing the total score.
+
+    Runs in O(slides * windows): for each slide, the best total ending at
+    window j is its own score plus the best total of the previous slide at
+    any window <= j, which is a running prefix maximum.
+    """
+    num_windows = len(scores[0])
+    best = scores[0][:]
+    back: list[list[int]] = []
+    for row in scores[1:]:
+        prefix_arg = []
+        arg = 0
+        for j in range(num_windows):
+            if best[j] > best[arg]:
+                arg = j
+            prefix_arg.append(arg)
+        best = [row[j] + best[prefix_arg[j]] for j in range(num_windows)]
+        back.append(prefix_arg)
+
+    path = [max(range(num_windows), key=best.__getitem__)]
+    for prefix_arg in reversed(back):
+        path.append(prefix_arg[path[-1]])
+    return path[::-1]
+
+
+def spread_starts(starts: list[float], duration: float, min_span: float) -> list[float]:
+    """Give every slide a time range of its own.
+
+    Slide 1 starts at 0. Slides that share a start (adjacent slides matched to
+    the same moment) split the time up to the next distinct start evenly.
+    Then every slide is given at least min_span seconds (less if the video is
+    too short for that), pushing later starts forward and pulling earlier
+    ones back so the last slide still starts before the end of the video.
+    """
+    starts = [0.0, *starts[1:]]
+    n = len(starts)
+    spread = starts[:]
+    i = 0
+    while i < n:
+        k = i
+        while k + 1 < n and starts[k + 1] <= starts[i]:
+            k += 1
+        following = starts[k + 1] if k + 1 < n else max(duration, starts[i])
+        for m in range(i, k + 1):
+            spread[m] = starts[i] + (m - i) * (following - starts[i]) / (k - i + 1)
+        i = k + 1
+
+    min_span = min(min_span, duration / n) if duration > 0 else 0.0
+    for i in range(1, n):
+        spread[i] = max(spread[i], spread[i - 1] + min_span)
+    latest = duration
+    for i in reversed(range(n)):
+        latest = min(spread[i], latest - min_span)
+        spread[i] = max(latest, 0.0)
+    return [float(round(start)) for start in spread]
+
+
+def align_slides(
+    slides: list[str],
+    index: TranscriptIndex,
+    frames: list[tuple[float, str]] | None = None,
+    window: float = 60.0,
+    step: float = 10.0,
+    frame_weight: float = 1.0,
+    min_span: float = MIN_SLIDE_SECONDS,
+) -> list[dict]:
+    """Return one {"slide", "start", "timestamp", "end", "score"} dict per slide.
+
+    Transcript windows are `window` seconds long and start every `step`
+    seconds. Frame descriptions count toward the window they fall in,
+    weighted by frame_weight. Every slide gets at least min_span seconds
+    (see spread_starts). The last slide ends with its matched window rather
+    than with the video, so whatever follows it (such as Q&A) is not
+    counted as part of it.
+    """
+    duration = index.ends[-1] if len(index) else 0.0
+    starts = [i * step for i in range(max(1, math.ceil(max(duration - window, 0) / step) + 1))]
+    window_tokens = [Counter(tokenize(index.text_between(s, s + window))) for s in starts]
+    frame_tokens = [Counter() for _ in starts]
+    for seconds, description in frames or []:
+        for j, s in enumerate(starts):
+            if s <= seconds < s + window:
+                frame_tokens[j].update(tokenize(description))
+
+    # Words on many slides (product names, footers) say little about where a slide is
+    slide_tokens = [Counter(tokenize(text)) for text in slides]
+    document_frequency = Counter(t for tokens in slide_tokens for t in tokens)
+    idf = {t: math.log((1 + len(slides)) / (1 + df)) + 1 for t, df in document_frequency.items()}
+
+    scores = overlap_scores(slide_tokens, window_tokens, idf)
+    if frames:
+        frame_scores = overlap_scores(slide_tokens, frame_tokens, idf)
+        scores = [[t + frame_weight * f for t, f in zip(row, frame_row)] for row, frame_row in zip(scores, frame_scores)]
+    path = monotonic_path(scores)
+
+    # Within its window, a slide starts at the first segment that mentions one of its
+    # most distinctive (above median IDF) words
+    alignment = []
+    previous_start = 0.0
+    for slide, (tokens, j) in enumerate(zip(slide_tokens, path), start=1):
+        start = starts[j]
+        if tokens:
+            weights = sorted(idf[t] for t in tokens)
+            key_tokens = {t for t in tokens if idf[t] >= weights[len(weights) // 2]}
+            for i in index.range_indices(max(starts[j], previous_start), starts[j] + window):
+                if key_tokens & set(tokenize(index.texts[i])):
+                    start = index.starts[i]
+                    break
+        start = max(start, previous_start)
+        alignment.append({"slide": slide, "start": start, "score": round(scores[slide - 1][j], 3)})
+        previous_start = start
+
+    spread = spread_starts([entry["start"] for entry in alignment], duration, min_span)
+    for entry, start in zip(alignment, spread):
+        entry["start"] = start
+        entry["timestamp"] = format_timestamp(start).strip("[]")
+    for current, following in zip(alignment, alignment[1:]):
+        current["end"] = max(following["start"], current["start"])
+    last = alignment[-1]
+    last["end"] = max(last["start"], min(duration, max(last["start"] + min_span, starts[path[-1]] + window)))
+    return alignment
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Align slides to transcript timestamps")
+    parser.add_argument("slide_text", help="slide_ascii.json (or slide_ascii.md) from extract_slide_text.py")
+    parser.add_argument("transcript", help="transcript.txt from extract_transcript.py")
+    parser.add_argument("output_path", help="Where to write alignment.json")
+    parser.add_argument("--frames", help="Optional frames_manifest.md with frame descriptions from capture_video_frames.py")
+    parser.add_argument("--window", type=float, default=60.0, help="Seconds of transcript per window (default: 60)")
+    parser.add_argument("--step", type=float, default=10.0, help="Seconds between window starts (default: 10)")
+    args = parser.parse_args()
+
+    for path in (args.slide_text, args.transcript, args.frames):
+        if path and not Path(path).exists():
+            print(f"Error: file not found: {path}")
+            sys.exit(1)
+
+    slides = load_slides(Path(args.slide_text))
+    index = TranscriptIndex.load(args.transcript)
+    if not slides or not len(index):
+        print("Error: need at least one slide and one transcript segment to align")
+        sys.exit(1)
+    frames = load_frames(Path(args.frames)) if args.frames else None
+
+    alignment = align_slides(slides, index, frames, args.window, args.step)
+
+    output_path = Path(args.output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps({"slides": alignment}, indent=2) + "\n")
+    print(f"Aligned {len(alignment)} slides to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
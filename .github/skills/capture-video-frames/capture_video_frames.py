@@ -2,18 +2,36 @@
 # requires-python = ">=3.11"
 # dependencies = []
 # ///
-"""Capture frames from a YouTube video at a regular interval.
+"""Capture frames from a YouTube video at a regular interval or at scene changes.
 
-Downloads the video with yt-dlp, then extracts frames with ffmpeg.
+Streams the video with yt-dlp into ffmpeg, which extracts frames in a single
+decode pass while the download is still running. Downloaded videos are kept in
+a size-bounded cache keyed by video ID, so later runs and recaptures reuse them.
 Produces PNG images and a frames_manifest.md mapping filenames to timestamps.
 """
 
 import argparse
+import hashlib
+import json
+import os
 import re
+import shutil
 import subprocess
 import sys
 import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import IO
+
+HASH_SIZE = 16
+HASH_CACHE_FILE = "frame_hashes.json"
+SAME_AS_PREVIOUS = "(same as previous)"
+# A single video-only stream, so yt-dlp can write it to stdout without a merge step
+VIDEO_FORMAT = "bestvideo[ext=mp4]/best[ext=mp4]/best"
+VIDEO_CACHE_DIR = Path.home() / ".cache" / "presentation-writeups" / "videos"
+STREAM_CHUNK_SIZE = 1024 * 1024
 
 
 def extract_video_id(url: str) -> str:
@@ -51,29 +69,140 @@ def format_timestamp(seconds: int) -> str:
     return f"[{minutes:02d}:{secs:02d}]"
 
 
+def yt_dlp_missing() -> None:
+    """Exit with install instructions for yt-dlp."""
+    print(
+        "yt-dlp not found. Install it:\n"
+        "  macOS: brew install yt-dlp\n"
+        "  pip: pip install yt-dlp",
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+
 def download_video(url: str, output_path: str) -> None:
-    """Download a YouTube video using yt-dlp."""
-    cmd = [
-        "yt-dlp",
-        "-f", "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
-        "--merge-output-format", "mp4",
-        "-o", output_path,
-        url,
-    ]
+    """Download a YouTube video using yt-dlp.
+
+    The download goes to a temporary directory next to output_path and is
+    moved into place when it is complete, so concurrent runs for the same
+    video never write to the same file.
+    """
+    output = Path(output_path)
+    with tempfile.TemporaryDirectory(dir=output.parent, prefix=".") as tmpdir:
+        tmp_path = Path(tmpdir) / output.name
+        cmd = [
+            "yt-dlp",
+            "-f", VIDEO_FORMAT,
+            "-o", str(tmp_path),
+            url,
+        ]
+        try:
+            subprocess.run(cmd, check=True)
+        except FileNotFoundError:
+            yt_dlp_missing()
+        os.replace(tmp_path, output)
+
+
+def stream_video(url: str, output_path: Path) -> Callable[[IO[bytes]], None]:
+    """Return a feed function that downloads a video while piping it to a consumer.
+
+    The feed writes each downloaded chunk both to the consumer (ffmpeg's stdin)
+    and to output_path, so frames are extracted while the download is still
+    running and the finished file is kept for later runs. If the consumer stops
+    reading early, the download continues to disk only. Each run writes its
+    own temporary file and moves it into place when the download completes.
+    """
+
+    def feed(sink: IO[bytes]) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+        partial_path = Path(tmp_name)
+        cmd = ["yt-dlp", "-f", VIDEO_FORMAT, "--quiet", "-o", "-", url]
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+        except FileNotFoundError:
+            os.close(fd)
+            partial_path.unlink()
+            yt_dlp_missing()
+
+        sink_open = True
+        with proc, os.fdopen(fd, "wb") as partial:
+            while chunk := proc.stdout.read(STREAM_CHUNK_SIZE):
+                partial.write(chunk)
+                if sink_open:
+                    try:
+                        sink.write(chunk)
+                    except BrokenPipeError:
+                        sink_open = False
+        if proc.returncode != 0:
+            partial_path.unlink(missing_ok=True)
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+        os.replace(partial_path, output_path)
+
+    return feed
+
+
+def evict_video_cache(cache_dir: Path, max_bytes: int, keep: Path) -> list[Path]:
+    """Delete least recently used videos until the cache fits in max_bytes.
+
+    Videos are ordered by modification time, which is bumped on every cache hit.
+    The video for the current run (keep) is never deleted.
+
+    Returns the deleted paths.
+    """
+    videos = sorted(cache_dir.glob("*.mp4"), key=lambda p: p.stat().st_mtime)
+    total = sum(video.stat().st_size for video in videos)
+    evicted = []
+    for video in videos:
+        if total <= max_bytes:
+            break
+        if video == keep:
+            continue
+        total -= video.stat().st_size
+        video.unlink()
+        evicted.append(video)
+    return evicted
+
+
+def run_ffmpeg(cmd: list[str], feed: Callable[[IO[bytes]], None] | None = None) -> subprocess.CompletedProcess:
+    """Run an ffmpeg command, exiting with install instructions if ffmpeg is missing.
+
+    If feed is given, it is called with ffmpeg's stdin to stream the input
+    (for commands that read from pipe:0).
+    """
     try:
-        subprocess.run(cmd, check=True)
+        if feed is None:
+            return subprocess.run(cmd, check=True, capture_output=True)
+        # Spool output to files so ffmpeg can't block on a full pipe while we feed stdin
+        with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=stdout, stderr=stderr)
+            try:
+                feed(proc.stdin)
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+                proc.wait()
+            stdout.seek(0)
+            stderr.seek(0)
+            result = subprocess.CompletedProcess(cmd, proc.returncode, stdout.read(), stderr.read())
+        result.check_returncode()
+        return result
     except FileNotFoundError:
         print(
-            "yt-dlp not found. Install it:\n"
-            "  macOS: brew install yt-dlp\n"
-            "  pip: pip install yt-dlp",
+            "ffmpeg not found. Install it:\n"
+            "  macOS: brew install ffmpeg\n"
+            "  Ubuntu: apt-get install ffmpeg",
             file=sys.stderr,
         )
         sys.exit(1)
 
 
-def extract_frames(video_path: str, output_dir: Path, interval: int) -> list[tuple[str, int]]:
-    """Extract frames from video at the given interval.
+def extract_frames_seek(video_path: str, output_dir: Path, interval: int) -> list[tuple[str, int]]:
+    """Extract frames by starting one ffmpeg process per timestamp.
+
+    Each process seeks to its timestamp and decodes a single frame. Kept for
+    comparison with the single-pass extractor (see --benchmark).
 
     Returns a list of (filename, timestamp_seconds) tuples.
     """
@@ -92,16 +221,7 @@ def extract_frames(video_path: str, output_dir: Path, interval: int) -> list[tup
             "-q:v", "2",
             str(output_file),
         ]
-        try:
-            subprocess.run(cmd, check=True, capture_output=True)
-        except FileNotFoundError:
-            print(
-                "ffmpeg not found. Install it:\n"
-                "  macOS: brew install ffmpeg\n"
-                "  Ubuntu: apt-get install ffmpeg",
-                file=sys.stderr,
-            )
-            sys.exit(1)
+        run_ffmpeg(cmd)
 
         if output_file.exists():
             frames.append((filename, t))
@@ -109,19 +229,346 @@ def extract_frames(video_path: str, output_dir: Path, interval: int) -> list[tup
     return frames
 
 
-def write_manifest(frames: list[tuple[str, int]], output_dir: Path) -> Path:
-    """Write frames_manifest.md with filenames, timestamps, and empty descriptions."""
+def extract_frames(
+    video_path: str,
+    output_dir: Path,
+    interval: int,
+    feed: Callable[[IO[bytes]], None] | None = None,
+) -> list[tuple[str, int]]:
+    """Extract frames from video at the given interval in a single decode pass.
+
+    One ffmpeg process decodes the video once and emits a frame every
+    `interval` seconds through the fps filter. Frames are written with
+    sequential names and then renamed to frame_NNNN.png by timestamp.
+    Pass video_path="pipe:0" and a feed (see stream_video) to extract
+    while the video is still downloading.
+
+    Returns a list of (filename, timestamp_seconds) tuples.
+    """
+    duration = get_video_duration(video_path) if feed is None else float("inf")
+    frames: list[tuple[str, int]] = []
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmpdir:
+        pattern = str(Path(tmpdir) / "%06d.png")
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-i", video_path,
+            "-vf", f"fps=1/{interval}:round=down",
+            "-start_number", "0",
+            "-q:v", "2",
+            pattern,
+        ]
+        run_ffmpeg(cmd, feed)
+
+        for sequential in sorted(Path(tmpdir).glob("*.png")):
+            t = int(sequential.stem) * interval
+            if t >= duration:
+                break
+            filename = f"frame_{t:04d}.png"
+            sequential.replace(output_dir / filename)
+            frames.append((filename, t))
+
+    return frames
+
+
+def select_scene_changes(change_times: list[float], min_gap: float) -> list[int]:
+    """Collapse bursts of scene changes into one change per burst, at least `min_gap` seconds apart.
+
+    A burst starts at a change and absorbs every change within `min_gap`
+    seconds of that start. The last change in the burst is kept, so slide
+    transitions and build animations are captured after they settle. A
+    change outside the burst but within `min_gap` of the kept change is
+    dropped, so kept changes are never closer than `min_gap`.
+
+    Returns indices into `change_times` (which must be sorted) of the kept changes.
+    """
+    selected: list[int] = []
+    burst_start: float | None = None
+    for i, t in enumerate(change_times):
+        if burst_start is not None and t - burst_start < min_gap:
+            selected[-1] = i
+            continue
+        if selected and t - change_times[selected[-1]] < min_gap:
+            continue
+        burst_start = t
+        selected.append(i)
+    return selected
+
+
+def parse_showinfo_times(stderr: bytes) -> dict[int, float]:
+    """Map each frame number showinfo reported (n, which is also its output file number) to its pts_time.
+
+    pts_time can be negative for frames before the stream's start time.
+    """
+    text = stderr.decode(errors="replace")
+    return {
+        int(n): float(t)
+        for n, t in re.findall(r"\bn:\s*(\d+)\s[^\n]*?\bpts_time:\s*(-?[0-9.]+)", text)
+    }
+
+
+def extract_scene_frames(
+    video_path: str,
+    output_dir: Path,
+    threshold: float,
+    min_gap: float,
+    feed: Callable[[IO[bytes]], None] | None = None,
+) -> list[tuple[str, int]]:
+    """Extract one frame per slide transition in a single decode pass.
+
+    ffmpeg's select filter keeps the first frame plus every frame whose scene
+    score exceeds `threshold`, and showinfo reports each kept frame's
+    timestamp. Changes closer together than `min_gap` seconds are collapsed
+    with select_scene_changes. Accepts the same streaming feed as extract_frames.
+
+    Returns a list of (filename, timestamp_seconds) tuples.
+    """
+    frames: list[tuple[str, int]] = []
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmpdir:
+        pattern = str(Path(tmpdir) / "%06d.png")
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-i", video_path,
+            "-vf", f"select='eq(n,0)+gt(scene,{threshold})',showinfo",
+            "-vsync", "vfr",
+            "-start_number", "0",
+            pattern,
+        ]
+        result = run_ffmpeg(cmd, feed)
+
+        times = parse_showinfo_times(result.stderr)
+        numbers = sorted(times)
+        change_times = [times[n] for n in numbers]
+
+        for i in select_scene_changes(change_times, min_gap):
+            t = max(0, int(change_times[i]))
+            # Filenames are keyed by whole seconds; keep the first frame per second
+            if frames and frames[-1][1] == t:
+                continue
+            filename = f"frame_{t:04d}.png"
+            (Path(tmpdir) / f"{numbers[i]:06d}.png").replace(output_dir / filename)
+            frames.append((filename, t))
+
+    return frames
+
+
+def parse_frame_timestamp(frame: str) -> int:
+    """Return the timestamp in seconds encoded in a frame_NNNN.png name."""
+    match = re.fullmatch(r"frame_(\d+)(?:\.png)?", Path(frame).name)
+    if not match:
+        raise ValueError(f"Not a frame filename: {frame}")
+    return int(match.group(1))
+
+
+def recapture_frames(
+    video_path: str,
+    output_dir: Path,
+    requests: list[tuple[str, list[int]]],
+) -> list[tuple[str, int, Path]]:
+    """Capture alternate frames at offsets from existing frames in one decode pass.
+
+    Each request is a frame filename (e.g. "frame_0120.png") and the offsets in
+    seconds to try (e.g. [2, 5, 8, 10]). All target timestamps are sorted and a
+    single ffmpeg process seeks to the earliest, decodes through the latest, and
+    selects the first frame at or after each target. Results are written as
+    alt_<FRAME>_<SECONDS>.png, e.g. alt_0120_0125.png.
+
+    Returns a list of (frame filename, target_seconds, alt_path) tuples.
+    """
+    wanted = [(frame, parse_frame_timestamp(frame) + offset) for frame, offsets in requests for offset in offsets]
+    targets = sorted({t for _, t in wanted if t >= 0})
+    if not targets:
+        return []
+
+    first, last = targets[0], targets[-1]
+    # With -ss before -i, t restarts at 0 at the seek point
+    terms = "+".join(f"gte(t,{t - first})*not(gte(prev_t,{t - first}))" for t in targets)
+    alt_by_target: dict[int, Path] = {}
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmpdir:
+        pattern = str(Path(tmpdir) / "%06d.png")
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-ss", str(first),
+            "-t", str(last - first + 1),
+            "-i", video_path,
+            "-vf", f"select='{terms}',showinfo",
+            "-vsync", "vfr",
+            "-start_number", "0",
+            pattern,
+        ]
+        result = run_ffmpeg(cmd)
+
+        times = parse_showinfo_times(result.stderr)
+        for t in targets:
+            for n in sorted(times):
+                if times[n] >= t - first:
+                    alt_by_target[t] = Path(tmpdir) / f"{n:06d}.png"
+                    break
+
+        recaptured = []
+        for frame, t in wanted:
+            if t not in alt_by_target:
+                continue
+            alt_path = output_dir / f"alt_{parse_frame_timestamp(frame):04d}_{t:04d}.png"
+            shutil.copyfile(alt_by_target[t], alt_path)
+            recaptured.append((frame, t, alt_path))
+
+    return recaptured
+
+
+def parse_recapture_request(value: str) -> tuple[str, list[int]]:
+    """Parse a FRAME:OFFSETS argument such as frame_0120.png:2,5,8,10."""
+    frame, _, offsets = value.partition(":")
+    try:
+        parse_frame_timestamp(frame)
+        parsed = [int(offset) for offset in offsets.split(",") if offset]
+    except ValueError:
+        parsed = []
+    if not parsed:
+        raise argparse.ArgumentTypeError(f"Expected FRAME:OFFSETS like frame_0120.png:2,5,8,10, got {value!r}")
+    return frame, parsed
+
+
+def parse_min_gap(value: str) -> float:
+    """Parse --min-gap, which must be at least 1 second since frames are named by whole seconds."""
+    try:
+        gap = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a number of seconds, got {value!r}")
+    if gap < 1:
+        raise argparse.ArgumentTypeError(f"--min-gap must be at least 1 second, got {value}")
+    return gap
+
+
+def benchmark_extraction(video_path: str, interval: int) -> None:
+    """Time the single-pass extractor against the per-timestamp seek loop."""
+    results = []
+    for name, extractor in [("seek", extract_frames_seek), ("single-pass", extract_frames)]:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            start = time.perf_counter()
+            frames = extractor(video_path, Path(tmpdir), interval)
+            elapsed = time.perf_counter() - start
+        results.append((name, len(frames), elapsed))
+
+    print(f"{'Method':<12} {'Frames':>7} {'Seconds':>9} {'Per frame':>10}")
+    for name, count, elapsed in results:
+        per_frame = elapsed / count if count else 0.0
+        print(f"{name:<12} {count:>7} {elapsed:>9.2f} {per_frame:>10.3f}")
+    seek_time, single_time = results[0][2], results[1][2]
+    if single_time > 0:
+        print(f"Speedup: {seek_time / single_time:.1f}x")
+
+
+def compute_dhash(image_path: Path, hash_size: int = HASH_SIZE) -> int:
+    """Compute a difference hash (dHash) of an image.
+
+    ffmpeg shrinks the image to (hash_size + 1) x hash_size grayscale pixels,
+    and each bit records whether a pixel is brighter than its right neighbor.
+    Near-identical frames produce hashes with a small Hamming distance.
+    """
+    cmd = [
+        "ffmpeg",
+        "-v", "error",
+        "-i", str(image_path),
+        "-vf", f"scale={hash_size + 1}:{hash_size}:flags=area,format=gray",
+        "-f", "rawvideo",
+        "-",
+    ]
+    pixels = run_ffmpeg(cmd).stdout
+    width = hash_size + 1
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * width + col]
+            right = pixels[row * width + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Count the differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def load_frame_hashes(output_dir: Path, filenames: list[str]) -> dict[str, int]:
+    """Return a dHash for each frame, reusing values cached in frame_hashes.json.
+
+    The cache maps each filename to the SHA-256 of its bytes and its hash, so
+    frames that are re-extracted with identical content are not rehashed.
+    """
+    cache_path = output_dir / HASH_CACHE_FILE
+    cache: dict[str, dict[str, str]] = {}
+    if cache_path.exists():
+        try:
+            cache = json.loads(cache_path.read_text())
+        except json.JSONDecodeError:
+            cache = {}
+
+    digests = {name: hashlib.sha256((output_dir / name).read_bytes()).hexdigest() for name in filenames}
+    stale = [name for name in filenames if cache.get(name, {}).get("sha256") != digests[name]]
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        for name, value in zip(stale, pool.map(lambda n: compute_dhash(output_dir / n), stale)):
+            cache[name] = {"sha256": digests[name], "dhash": f"{value:0{HASH_SIZE * HASH_SIZE // 4}x}"}
+
+    kept = {name: cache[name] for name in filenames}
+    cache_path.write_text(json.dumps(kept, indent=2) + "\n")
+    return {name: int(entry["dhash"], 16) for name, entry in kept.items()}
+
+
+def group_similar_frames(
+    frames: list[tuple[str, int]],
+    hashes: dict[str, int],
+    max_distance: int,
+) -> list[list[tuple[str, int]]]:
+    """Group consecutive frames whose hash is within max_distance of the group's first frame.
+
+    Comparing against the first frame (rather than the previous one) keeps slow
+    changes, like a slide building up bullet by bullet, from chaining into one group.
+    """
+    groups: list[list[tuple[str, int]]] = []
+    for frame in frames:
+        if groups and hamming_distance(hashes[groups[-1][0][0]], hashes[frame[0]]) <= max_distance:
+            groups[-1].append(frame)
+        else:
+            groups.append([frame])
+    return groups
+
+
+def write_manifest(
+    frames: list[tuple[str, int]],
+    output_dir: Path,
+    groups: list[list[tuple[str, int]]] | None = None,
+) -> Path:
+    """Write frames_manifest.md with filenames, timestamps, and empty descriptions.
+
+    If groups of near-identical frames are given, every frame after the first in
+    a group is pre-filled with "(same as previous)" so it is not sent to the
+    describe-frame agent.
+    """
+    duplicates = set()
+    for group in groups or []:
+        duplicates.update(filename for filename, _ in group[1:])
+
     manifest_path = output_dir / "frames_manifest.md"
     lines = ["| File | Timestamp | Description |", "|------|-----------|-------------|"]
     for filename, seconds in frames:
         timestamp = format_timestamp(seconds)
-        lines.append(f"| {filename} | {timestamp} | |")
+        if filename in duplicates:
+            lines.append(f"| {filename} | {timestamp} | {SAME_AS_PREVIOUS} |")
+        else:
+            lines.append(f"| {filename} | {timestamp} | |")
     manifest_path.write_text("\n".join(lines) + "\n")
     return manifest_path
 
 
 def main() -> None:
-    """Download a YouTube video and capture frames at a regular interval."""
+    """Download a YouTube video and capture frames at a regular interval or at scene changes."""
     parser = argparse.ArgumentParser(description="Capture frames from a YouTube video")
     parser.add_argument("youtube_url", help="YouTube video URL")
     parser.add_argument("output_dir", help="Directory to save frames and manifest")
@@ -131,24 +578,130 @@ def main() -> None:
         default=30,
         help="Seconds between captured frames (default: 30)",
     )
+    parser.add_argument(
+        "--mode",
+        choices=["interval", "scene"],
+        default="interval",
+        help="Sample at a fixed interval, or capture a frame at each scene change. Default: interval",
+    )
+    parser.add_argument(
+        "--scene-threshold",
+        type=float,
+        default=0.3,
+        help="ffmpeg scene score (0-1) that counts as a slide change in scene mode (default: 0.3)",
+    )
+    parser.add_argument(
+        "--min-gap",
+        type=parse_min_gap,
+        default=5,
+        help="Minimum seconds between captured frames in scene mode, at least 1 (default: 5)",
+    )
+    parser.add_argument(
+        "--hash-distance",
+        type=int,
+        default=16,
+        help=f"Max Hamming distance between {HASH_SIZE * HASH_SIZE}-bit frame hashes to treat frames as duplicates (default: 16)",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Skip perceptual-hash deduplication and leave every description empty",
+    )
+    parser.add_argument(
+        "--method",
+        choices=["single-pass", "seek"],
+        default="single-pass",
+        help="Decode the video once (single-pass) or seek once per frame (seek). Default: single-pass",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(VIDEO_CACHE_DIR),
+        help=f"Directory for downloaded videos, reused across runs (default: {VIDEO_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-size-gb",
+        type=float,
+        default=10,
+        help="Evict least recently used videos once the cache exceeds this size (default: 10)",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Finish downloading before extracting frames instead of extracting while downloading",
+    )
+    parser.add_argument(
+        "--recapture",
+        type=parse_recapture_request,
+        action="append",
+        metavar="FRAME:OFFSETS",
+        help="Capture alt_<FRAME>_<SECONDS>.png at offsets from an existing frame, "
+        "e.g. frame_0120.png:2,5,8,10. Repeatable; all requests share one decode pass",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Time both extraction methods on the downloaded video instead of saving frames",
+    )
     args = parser.parse_args()
 
-    # Validate URL
-    extract_video_id(args.youtube_url)
+    video_id = extract_video_id(args.youtube_url)
 
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    cache_dir = Path(args.cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    video_path = cache_dir / f"{video_id}.mp4"
 
-    # Download video to a temp file
-    with tempfile.TemporaryDirectory() as tmpdir:
-        video_path = str(Path(tmpdir) / "video.mp4")
+    if args.recapture:
+        if video_path.exists():
+            video_path.touch()
+        else:
+            print(f"Downloading video from {args.youtube_url}...")
+            download_video(args.youtube_url, str(video_path))
+        recaptured = recapture_frames(str(video_path), output_dir, args.recapture)
+        for frame, seconds, alt_path in recaptured:
+            print(f"{frame} {format_timestamp(seconds)} -> {alt_path}")
+        for evicted in evict_video_cache(cache_dir, int(args.cache_size_gb * 1024**3), keep=video_path):
+            print(f"Evicted {evicted.name} from the video cache")
+        return
+
+    # Stream the download into ffmpeg unless the video is cached or the chosen path needs a seekable file
+    feed = None
+    if video_path.exists():
+        print(f"Using cached video {video_path}")
+        video_path.touch()
+    elif args.benchmark or args.method == "seek" or args.no_stream:
         print(f"Downloading video from {args.youtube_url}...")
-        download_video(args.youtube_url, video_path)
+        download_video(args.youtube_url, str(video_path))
+    else:
+        print(f"Streaming video from {args.youtube_url} to {video_path}...")
+        feed = stream_video(args.youtube_url, video_path)
+    source = "pipe:0" if feed else str(video_path)
+
+    if args.benchmark:
+        benchmark_extraction(str(video_path), args.interval)
+        return
 
+    if args.mode == "scene":
+        print(f"Extracting frames at scene changes (threshold {args.scene_threshold})...")
+        frames = extract_scene_frames(source, output_dir, args.scene_threshold, args.min_gap, feed)
+    else:
         print(f"Extracting frames every {args.interval} seconds...")
-        frames = extract_frames(video_path, output_dir, args.interval)
+        if args.method == "single-pass":
+            frames = extract_frames(source, output_dir, args.interval, feed)
+        else:
+            frames = extract_frames_seek(source, output_dir, args.interval)
+
+    for evicted in evict_video_cache(cache_dir, int(args.cache_size_gb * 1024**3), keep=video_path):
+        print(f"Evicted {evicted.name} from the video cache")
+
+    groups = None
+    if not args.no_dedup:
+        hashes = load_frame_hashes(output_dir, [filename for filename, _ in frames])
+        groups = group_similar_frames(frames, hashes, args.hash_distance)
+        print(f"Found {len(groups)} distinct frames out of {len(frames)} captured")
 
-    manifest_path = write_manifest(frames, output_dir)
+    manifest_path = write_manifest(frames, output_dir, groups)
     print(f"Captured {len(frames)} frames in {output_dir}")
     print(f"Manifest written to {manifest_path}")
 
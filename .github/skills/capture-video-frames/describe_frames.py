@@ -0,0 +1,190 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "aiohttp",
+#     "azure-identity",
+#     "openai",
+#     "python-dotenv",
+# ]
+# ///
+"""Describe the captured frames in frames_manifest.md with a vision model.
+
+Each frame is described with the previous frame and its description as
+context, so an unchanged frame can be marked "(same as previous)". That chain
+only matters while the same scene is on screen. So the frames are first split
+into segments at scene changes, which are detected by comparing the
+perceptual hashes of consecutive frames. Each segment is described in order,
+and the segments run in parallel. The manifest is rewritten atomically after
+every description, so an interrupted run can resume where it stopped.
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import openai
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(REPO_ROOT))
+from azure_openai_client import chat_completion_async  # noqa: E402
+from capture_video_frames import SAME_AS_PREVIOUS, hamming_distance, load_frame_hashes  # noqa: E402
+
+AGENT_FILE = REPO_ROOT / ".github" / "agents" / "describe-frame.md"
+MANIFEST_FILE = "frames_manifest.md"
+# Consecutive frames further apart than this (out of 256 hash bits) start a new segment
+DEFAULT_SCENE_DISTANCE = 48
+
+
+def load_manifest(manifest_path: Path) -> list[list[str]]:
+    """Return the [file, timestamp, description] rows of a frames manifest."""
+    rows = []
+    for line in manifest_path.read_text().splitlines():
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if len(cells) >= 3 and re.fullmatch(r"\[[\d:]+\]", cells[1]):
+            rows.append([cells[0], cells[1], "|".join(cells[2:]).strip()])
+    return rows
+
+
+def write_manifest(manifest_path: Path, rows: list[list[str]]) -> None:
+    """Rewrite the manifest through a temporary file, so readers never see a partial table."""
+    lines = ["| File | Timestamp | Description |", "|------|-----------|-------------|"]
+    lines += [f"| {name} | {timestamp} | {description.replace('|', '/')} |" for name, timestamp, description in rows]
+    fd, tmp_name = tempfile.mkstemp(dir=manifest_path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_name, manifest_path)
+
+
+def split_segments(names: list[str], hashes: dict[str, int], scene_distance: int) -> list[list[int]]:
+    """Split row indices into runs of frames with no scene change between neighbors."""
+    segments: list[list[int]] = []
+    for i, name in enumerate(names):
+        if segments and hamming_distance(hashes[names[i - 1]], hashes[name]) <= scene_distance:
+            segments[-1].append(i)
+        else:
+            segments.append([i])
+    return segments
+
+
+def load_instructions() -> str:
+    """The describe-frame agent's instructions, without its frontmatter."""
+    text = AGENT_FILE.read_text()
+    return re.sub(r"\A---\n.*?\n---\n", "", text, count=1, flags=re.DOTALL).strip()
+
+
+def image_part(path: Path, detail: str) -> dict:
+    data = base64.b64encode(path.read_bytes()).decode()
+    return {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{data}", "detail": detail}}
+
+
+def frame_messages(
+    instructions: str,
+    current: Path,
+    previous: Path | None,
+    previous_description: str | None,
+    detail: str,
+) -> list[dict]:
+    content: list[dict] = [{"type": "text", "text": "Describe the current frame image:"}, image_part(current, detail)]
+    if previous:
+        content += [{"type": "text", "text": "The previous frame image is:"}, image_part(previous, detail)]
+        if previous_description:
+            content.append({"type": "text", "text": f'The previous frame was described as: "{previous_description}"'})
+    return [{"role": "system", "content": instructions}, {"role": "user", "content": content}]
+
+
+async def describe_frames(
+    output_dir: str,
+    scene_distance: int = DEFAULT_SCENE_DISTANCE,
+    concurrency: int = 4,
+    detail: str = "high",
+) -> int:
+    """Fill in every empty description in the manifest. Returns how many frames were described."""
+    frames_dir = Path(output_dir)
+    manifest_path = frames_dir / MANIFEST_FILE
+    rows = load_manifest(manifest_path)
+    names = [row[0] for row in rows]
+    hashes = load_frame_hashes(frames_dir, names)
+    segments = split_segments(names, hashes, scene_distance)
+    instructions = load_instructions()
+    semaphore = asyncio.Semaphore(concurrency)
+    described = 0
+
+    todo = sum(1 for row in rows if not row[2])
+    print(f"Describing {todo} frames in {sum(1 for s in segments if any(not rows[i][2] for i in s))} independent segments")
+
+    async def describe_segment(segment: list[int]) -> None:
+        nonlocal described
+        previous: int | None = None
+        previous_description: str | None = None
+        for i in segment:
+            name, _, description = rows[i]
+            if not description:
+                async with semaphore:
+                    try:
+                        result = await chat_completion_async(
+                            frame_messages(
+                                instructions,
+                                frames_dir / name,
+                                frames_dir / names[previous] if previous is not None else None,
+                                previous_description,
+                                detail,
+                            ),
+                            temperature=0.2,
+                            max_tokens=400,
+                        )
+                    except openai.OpenAIError as e:
+                        # Later frames in this segment need this description, so leave them for the next run
+                        print(f"Warning: could not describe {name}, stopping its segment: {e}", file=sys.stderr)
+                        return
+                description = " ".join((result["content"] or "").split())
+                rows[i][2] = description
+                # Single event loop, so the rewrite cannot interleave with another one
+                write_manifest(manifest_path, rows)
+                described += 1
+                print(f"{name}: {description}")
+            previous = i
+            # "(same as previous)" rows carry the last real description forward
+            if description != SAME_AS_PREVIOUS:
+                previous_description = description
+
+    await asyncio.gather(*(describe_segment(segment) for segment in segments))
+    return described
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv(REPO_ROOT / ".env", override=True)
+
+    parser = argparse.ArgumentParser(description="Describe captured video frames, running independent scenes in parallel")
+    parser.add_argument("output_dir", help="Directory with the frames and frames_manifest.md from capture_video_frames.py")
+    parser.add_argument(
+        "--scene-distance",
+        type=int,
+        default=DEFAULT_SCENE_DISTANCE,
+        help=f"Hash distance (out of 256 bits) between consecutive frames that starts a new segment (default: {DEFAULT_SCENE_DISTANCE})",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum vision requests at once (default: 4)")
+    parser.add_argument(
+        "--detail",
+        choices=["low", "high"],
+        default="high",
+        help="Image detail level sent to the model (default: high)",
+    )
+    args = parser.parse_args()
+
+    if not (Path(args.output_dir) / MANIFEST_FILE).exists():
+        print(f"Error: {MANIFEST_FILE} not found in {args.output_dir}")
+        sys.exit(1)
+
+    described = asyncio.run(describe_frames(args.output_dir, args.scene_distance, args.concurrency, args.detail))
+    print(f"Described {described} frames in {Path(args.output_dir) / MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
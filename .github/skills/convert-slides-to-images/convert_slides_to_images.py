@@ -1,56 +1,412 @@
 # /// script
 # requires-python = ">=3.11"
-# dependencies = []
+# dependencies = [
+#     "pillow",
+#     "pypdf",
+# ]
 # ///
-"""Convert a PDF file into individual PNG slide images using pdftoppm."""
+"""Convert a PDF file into individual slide images (PNG, JPEG, or WebP) using pdftoppm."""
 
+import argparse
+import hashlib
+import json
+import os
+import re
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from PIL import Image
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
 
-def pdf2imgs(pdf_path: str, output_dir: str, prefix: str = "slide") -> list[str]:
-    """Split a PDF into individual PNG images."""
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+REPO_ROOT = Path(__file__).resolve().parents[3]
+FINGERPRINT_FILE = "slide_fingerprints.json"
+IMAGE_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+# pdftoppm's default resolution
+DEFAULT_DPI = 150
+DEFAULT_QUALITY = 85
+DEFAULT_LLM_MAX_WIDTH = 1024
 
-    cmd = ["pdftoppm", "-png", str(pdf_path), str(output_path / prefix)]
 
+def run_poppler(cmd: list[str]) -> subprocess.CompletedProcess:
+    """Run a poppler command, raising a helpful error if poppler is not installed."""
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
+        return subprocess.run(cmd, check=True, capture_output=True, text=True)
     except FileNotFoundError:
         raise FileNotFoundError(
-            "pdftoppm not found. Install poppler:\n"
+            f"{cmd[0]} not found. Install poppler:\n"
             "  macOS: brew install poppler\n"
             "  Ubuntu: apt-get install poppler-utils"
         )
 
-    # pdftoppm creates files like slide-01.png, slide-02.png, etc.
-    # Rename to slide_1.png, slide_2.png format (strip leading zeros)
-    image_files = []
-    for f in sorted(output_path.glob(f"{prefix}-*.png")):
-        page_num = int(f.stem.split("-")[-1])
-        new_name = output_path / f"{prefix}_{page_num}.png"
-        f.rename(new_name)
-        image_files.append(str(new_name))
 
+def get_page_info(pdf_path: str) -> tuple[int, float]:
+    """Return the number of pages and the page width in points using pdfinfo."""
+    result = run_poppler(["pdfinfo", str(pdf_path)])
+    pages = re.search(r"^Pages:\s+(\d+)", result.stdout, re.MULTILINE)
+    size = re.search(r"^Page size:\s+([\d.]+) x ([\d.]+) pts", result.stdout, re.MULTILINE)
+    if not pages:
+        raise ValueError(f"Could not determine page count of {pdf_path}")
+    return int(pages.group(1)), float(size.group(1)) if size else 0.0
+
+
+def image_settings(
+    image_format: str = "png",
+    dpi: int = DEFAULT_DPI,
+    max_width: int | None = None,
+    quality: int = DEFAULT_QUALITY,
+) -> dict:
+    """Bundle the render settings that determine what an image file looks like."""
+    if image_format not in IMAGE_EXTENSIONS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    return {"format": image_format, "dpi": dpi, "max_width": max_width, "quality": quality}
+
+
+def pdftoppm_args(settings: dict, page_width_pts: float) -> list[str]:
+    """Translate render settings into pdftoppm options.
+
+    WebP is rendered as PNG and converted afterwards, since pdftoppm cannot
+    write it. If the page would be wider than max_width at the requested DPI,
+    it is scaled down to max_width instead.
+    """
+    args = ["-r", str(settings["dpi"])]
+    if settings["format"] == "jpeg":
+        args += ["-jpeg", "-jpegopt", f"quality={settings['quality']}"]
+    else:
+        args += ["-png"]
+    max_width = settings["max_width"]
+    if max_width and page_width_pts / 72 * settings["dpi"] > max_width:
+        args += ["-scale-to-x", str(max_width), "-scale-to-y", "-1"]
+    return args
+
+
+def convert_to_webp(png_path: Path, quality: int) -> Path:
+    """Convert a rendered PNG to WebP, deleting the PNG."""
+    webp_path = png_path.with_suffix(".webp")
+    with Image.open(png_path) as image:
+        image.save(webp_path, "WEBP", quality=quality)
+    png_path.unlink()
+    return webp_path
+
+
+def split_pages(num_pages: int, jobs: int) -> list[tuple[int, int]]:
+    """Split pages 1..num_pages into up to `jobs` contiguous (first, last) ranges."""
+    jobs = max(1, min(jobs, num_pages))
+    size, extra = divmod(num_pages, jobs)
+    shards = []
+    first = 1
+    for i in range(jobs):
+        last = first + size - 1 + (1 if i < extra else 0)
+        shards.append((first, last))
+        first = last + 1
+    return shards
+
+
+def page_ranges(pages: list[int], jobs: int) -> list[tuple[int, int]]:
+    """Group sorted page numbers into contiguous (first, last) ranges, one pdftoppm call each.
+
+    Runs of consecutive pages are split further until there are at least
+    `jobs` ranges (or every range is a single page), so all jobs get work.
+    """
+    ranges: list[tuple[int, int]] = []
+    for page_num in pages:
+        if ranges and ranges[-1][1] == page_num - 1:
+            ranges[-1] = (ranges[-1][0], page_num)
+        else:
+            ranges.append((page_num, page_num))
+    while len(ranges) < jobs:
+        first, last = max(ranges, key=lambda r: r[1] - r[0])
+        if first == last:
+            break
+        ranges.remove((first, last))
+        ranges += [(first + a - 1, first + b - 1) for a, b in split_pages(last - first + 1, 2)]
+    return sorted(ranges)
+
+
+def render_range(
+    pdf_path: str,
+    output_path: Path,
+    prefix: str,
+    first: int,
+    last: int,
+    args: list[str],
+    settings: dict,
+) -> None:
+    """Render pages first..last with one pdftoppm call and move them to <prefix>_<N>.<ext>.
+
+    pdftoppm writes into a temporary directory of its own, since it names
+    files like page-01.png with padding that depends on the page count.
+    """
+    rendered_ext = "jpg" if settings["format"] == "jpeg" else "png"
+    with tempfile.TemporaryDirectory(dir=output_path) as tmpdir:
+        run_poppler(["pdftoppm", *args, "-f", str(first), "-l", str(last), str(pdf_path), str(Path(tmpdir) / "page")])
+        for f in Path(tmpdir).glob(f"page-*.{rendered_ext}"):
+            page_num = int(f.stem.split("-")[-1])
+            target = output_path / f"{prefix}_{page_num}.{rendered_ext}"
+            os.replace(f, target)
+            if settings["format"] == "webp":
+                convert_to_webp(target, settings["quality"])
+
+
+def render_ranges(
+    pdf_path: str,
+    output_path: Path,
+    prefix: str,
+    ranges: list[tuple[int, int]],
+    args: list[str],
+    settings: dict,
+    jobs: int,
+) -> None:
+    """Render page ranges with up to `jobs` pdftoppm processes at once."""
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [
+            pool.submit(render_range, pdf_path, output_path, prefix, first, last, args, settings)
+            for first, last in ranges
+        ]
+        for future in futures:
+            future.result()
+
+
+def hash_pdf_object(obj, memo: dict[tuple[int, int], str]) -> str:
+    """Hash a PDF object and everything it references, such as fonts and images.
+
+    Indirect objects are hashed once and memoized, so resources shared by many
+    pages are only read once. /Parent links are skipped so a page does not
+    pull in the whole page tree.
+    """
+    if isinstance(obj, IndirectObject):
+        ref = (obj.idnum, obj.generation)
+        if ref not in memo:
+            # Placeholder in case the object refers back to itself
+            memo[ref] = f"ref {ref}"
+            memo[ref] = hash_pdf_object(obj.get_object(), memo)
+        return memo[ref]
+
+    digest = hashlib.sha256(type(obj).__name__.encode())
+    if isinstance(obj, DictionaryObject):
+        for key in sorted(obj):
+            if key != "/Parent":
+                digest.update(f"{key}={hash_pdf_object(obj.raw_get(key), memo)};".encode())
+        if isinstance(obj, StreamObject):
+            # The encoded bytes, as pypdf's own hash_bin uses: decoding every image would be slow, and
+            # fails for filters pypdf cannot decode (JBIG2, some JPX and CCITT). /Filter and
+            # /DecodeParms are hashed with the other keys above.
+            digest.update(obj._data if obj._data is not None else obj.get_data())
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            digest.update(hash_pdf_object(item, memo).encode())
+    else:
+        digest.update(repr(obj).encode())
+    return digest.hexdigest()
+
+
+def page_content_hashes(pdf_path: str, num_pages: int) -> list[str]:
+    """Hash each page from its content streams, resources, and page attributes.
+
+    Images, fonts, and other resources are hashed by their encoded stream
+    data, without decoding it, so an edited screenshot or a color change changes the page's hash even when its
+    text does not. Returns one SHA-256 hex digest per page.
+    """
+    reader = PdfReader(pdf_path)
+    memo: dict[tuple[int, int], str] = {}
+    hashes = [hash_pdf_object(page, memo) for page in reader.pages]
+    if len(hashes) != num_pages:
+        raise ValueError(f"pypdf found {len(hashes)} pages in {pdf_path}, pdfinfo found {num_pages}")
+    return hashes
+
+
+def render_view(
+    pdf_path: str,
+    output_path: Path,
+    prefix: str,
+    content_hashes: list[str],
+    page_width_pts: float,
+    settings: dict,
+    jobs: int,
+    force: bool,
+) -> list[str]:
+    """Render pages whose fingerprint changed into one output directory.
+
+    A page's fingerprint combines its content hash with the render settings and
+    is recorded in slide_fingerprints.json. Images for pages beyond the current
+    page count, or in a different format, are deleted.
+    """
+    output_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_path / FINGERPRINT_FILE
+    num_pages = len(content_hashes)
+    ext = IMAGE_EXTENSIONS[settings["format"]]
+    settings_json = json.dumps(settings, sort_keys=True)
+    fingerprints = [hashlib.sha256(f"{settings_json}{h}".encode()).hexdigest() for h in content_hashes]
+
+    previous = {}
+    if manifest_path.exists() and not force:
+        previous = json.loads(manifest_path.read_text()).get("pages", {})
+
+    image_names = [f"{prefix}_{page_num}.{ext}" for page_num in range(1, num_pages + 1)]
+    stale_pages = [
+        page_num
+        for page_num, name, fingerprint in zip(range(1, num_pages + 1), image_names, fingerprints)
+        if previous.get(name) != fingerprint or not (output_path / name).exists()
+    ]
+
+    if stale_pages:
+        args = pdftoppm_args(settings, page_width_pts)
+        render_ranges(pdf_path, output_path, prefix, page_ranges(stale_pages, jobs), args, settings, jobs)
+    print(f"{output_path}: rendered {len(stale_pages)} of {num_pages} pages ({num_pages - len(stale_pages)} unchanged)")
+
+    # Remove images left over from a longer version of the deck or another format
+    current = set(image_names)
+    for f in output_path.glob(f"{prefix}_*.*"):
+        if f.suffix.lstrip(".") in IMAGE_EXTENSIONS.values() and f.name not in current:
+            f.unlink()
+            print(f"Removed stale {f.name}")
+
+    manifest = {"settings": settings, "pages": dict(zip(image_names, fingerprints))}
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n")
+    return [str(output_path / name) for name in image_names]
+
+
+def pdf2imgs(
+    pdf_path: str,
+    output_dir: str,
+    prefix: str = "slide",
+    jobs: int = 1,
+    force: bool = False,
+    settings: dict | None = None,
+    llm_dir: str | None = None,
+    llm_settings: dict | None = None,
+) -> list[str]:
+    """Split a PDF into individual slide images.
+
+    Only pages whose fingerprint (content plus render settings) differs from the
+    one recorded in slide_fingerprints.json are rendered, unless force is set.
+    With jobs > 1, pages to render are split into contiguous ranges rendered by
+    parallel pdftoppm processes, one process per range.
+
+    If llm_dir is given, a second, downscaled "LLM view" is rendered there with
+    llm_settings, for sending to vision models, while output_dir keeps the
+    full-quality images embedded in the writeup.
+
+    Returns the paths of the images in output_dir.
+    """
+    settings = settings or image_settings()
+    num_pages, page_width_pts = get_page_info(pdf_path)
+    content_hashes = page_content_hashes(pdf_path, num_pages)
+
+    image_files = render_view(
+        pdf_path, Path(output_dir), prefix, content_hashes, page_width_pts, settings, jobs, force
+    )
+    if llm_dir:
+        llm_settings = llm_settings or image_settings("jpeg", max_width=DEFAULT_LLM_MAX_WIDTH)
+        render_view(pdf_path, Path(llm_dir), prefix, content_hashes, page_width_pts, llm_settings, jobs, force)
     return image_files
 
 
+def benchmark(pdf_paths: list[str]) -> None:
+    """Time rendering each PDF with 1, 2, 4, ... jobs up to the CPU count.
+
+    Only rendering is timed: every job count renders all pages, split into
+    one contiguous range per job, without the fingerprint pass.
+    """
+    cpu_count = os.cpu_count() or 1
+    job_counts = sorted({2**i for i in range(cpu_count.bit_length()) if 2**i <= cpu_count} | {cpu_count})
+    settings = image_settings()
+
+    print(f"{'PDF':<50} {'Pages':>5} {'Jobs':>4} {'Seconds':>8} {'Speedup':>7}")
+    for pdf_path in pdf_paths:
+        num_pages, page_width_pts = get_page_info(pdf_path)
+        args = pdftoppm_args(settings, page_width_pts)
+        baseline = None
+        for jobs in job_counts:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                start = time.perf_counter()
+                render_ranges(pdf_path, Path(tmpdir), "slide", split_pages(num_pages, jobs), args, settings, jobs)
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            name = Path(pdf_path).name[-50:]
+            print(f"{name:<50} {num_pages:>5} {jobs:>4} {elapsed:>8.2f} {baseline / elapsed:>6.1f}x")
+
+
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: uv run convert_slides_to_images.py <pdf_path> <output_dir>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Convert a PDF into one image per page")
+    parser.add_argument("pdf_path", nargs="?", help="Path to the PDF file")
+    parser.add_argument("output_dir", nargs="?", help="Directory to save the slide images")
+    parser.add_argument(
+        "--format",
+        choices=list(IMAGE_EXTENSIONS),
+        default="png",
+        help="Image format (default: png)",
+    )
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help=f"Render resolution (default: {DEFAULT_DPI})")
+    parser.add_argument("--max-width", type=int, help="Scale pages down to at most this many pixels wide")
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=DEFAULT_QUALITY,
+        help=f"JPEG/WebP quality, 1-100 (default: {DEFAULT_QUALITY})",
+    )
+    parser.add_argument(
+        "--llm-dir",
+        help="Also render a downscaled copy of every slide here for sending to vision models",
+    )
+    parser.add_argument(
+        "--llm-max-width",
+        type=int,
+        default=DEFAULT_LLM_MAX_WIDTH,
+        help=f"Maximum width of LLM-view images (default: {DEFAULT_LLM_MAX_WIDTH})",
+    )
+    parser.add_argument(
+        "--llm-format",
+        choices=list(IMAGE_EXTENSIONS),
+        default="jpeg",
+        help="Image format of LLM-view images (default: jpeg)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of pdftoppm processes to render page ranges in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render every page even if its fingerprint is unchanged",
+    )
+    parser.add_argument(
+        "--benchmark",
+        nargs="*",
+        metavar="PDF",
+        help="Time rendering with 1 to CPU-count jobs on the given PDFs (default: presentations/*/*.pdf)",
+    )
+    args = parser.parse_args()
 
-    pdf_path = sys.argv[1]
-    output_dir = sys.argv[2]
+    if args.benchmark is not None:
+        pdf_paths = args.benchmark or sorted(str(p) for p in REPO_ROOT.glob("presentations/*/*.pdf"))
+        benchmark(pdf_paths)
+        return
+
+    if not args.pdf_path or not args.output_dir:
+        print("Usage: uv run convert_slides_to_images.py <pdf_path> <output_dir> [--jobs N] [--format FORMAT]")
+        sys.exit(1)
 
-    if not Path(pdf_path).exists():
-        print(f"Error: PDF file not found: {pdf_path}")
+    if not Path(args.pdf_path).exists():
+        print(f"Error: PDF file not found: {args.pdf_path}")
         sys.exit(1)
 
-    image_files = pdf2imgs(pdf_path, output_dir)
-    print(f"Created {len(image_files)} slide images in {output_dir}")
+    image_files = pdf2imgs(
+        args.pdf_path,
+        args.output_dir,
+        jobs=args.jobs,
+        force=args.force,
+        settings=image_settings(args.format, args.dpi, args.max_width, args.quality),
+        llm_dir=args.llm_dir,
+        llm_settings=image_settings(args.llm_format, args.dpi, args.llm_max_width, args.quality),
+    )
+    print(f"{len(image_files)} slide images in {args.output_dir}")
     for f in image_files:
         print(f"  {f}")
 
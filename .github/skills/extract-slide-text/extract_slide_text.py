@@ -2,102 +2,241 @@
 # requires-python = ">=3.11"
 # dependencies = []
 # ///
-"""Extract text from each page of a PDF into a markdown file using pdftotext."""
+"""Extract text and basic layout from each page of a PDF using pdftohtml.
 
+Writes a markdown file with the text of each slide, plus a JSON sidecar with
+each slide's title candidate, text blocks with bounding boxes, and links.
+If pdftohtml's XML cannot be parsed, the text comes from pdftotext instead,
+without layout or links.
+"""
+
+import json
+import re
+import statistics
 import subprocess
 import sys
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
+# Characters that are invalid in XML but occasionally emitted by pdftohtml
+INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def run_poppler(args: list[str]) -> str:
+    """Run a poppler command and return its stdout."""
+    try:
+        result = subprocess.run(args, check=True, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"{args[0]} not found. Install poppler:\n"
+            "  macOS: brew install poppler\n"
+            "  Ubuntu: apt-get install poppler-utils"
+        )
+    return result.stdout
+
+
+def parse_pdf_text(pdf_path: str) -> list[dict]:
+    """Extract every page's text with pdftotext -layout, without blocks or links.
+
+    Returns page dicts like parse_pdf_pages, with the page text under "text".
+    """
+    pages = run_poppler(["pdftotext", "-layout", str(pdf_path), "-"]).split("\f")
+    # pdftotext appends a trailing form feed, so the last element is empty
+    if pages and pages[-1].strip() == "":
+        pages = pages[:-1]
+    return [{"width": 0.0, "height": 0.0, "blocks": [], "links": [], "text": text} for text in pages]
+
+
+def parse_pdf_pages(pdf_path: str) -> list[dict]:
+    """Extract every page's text fragments, fonts, and links in one pdftohtml pass.
 
-def extract_slide_text(pdf_path: str, output_path: str, images_dir: str | None = None) -> str:
-    """Extract text from each PDF page into a markdown file.
+    Returns one dict per page with "width", "height", "blocks" (text, bbox,
+    font_size) and "links" (url, text, bbox). Coordinates are in PDF points
+    with the origin at the top-left of the page. pdftohtml sometimes writes
+    malformed XML (such as an unescaped & in a link); then the pages come from
+    parse_pdf_text instead.
+    """
+    xml = run_poppler(["pdftohtml", "-xml", "-i", "-q", "-stdout", "-zoom", "1", str(pdf_path)])
+    try:
+        root = ET.fromstring(INVALID_XML_CHARS.sub("", xml).encode())
+    except ET.ParseError as e:
+        print(f"Warning: could not parse pdftohtml output ({e}), extracting plain text with pdftotext")
+        return parse_pdf_text(pdf_path)
+    font_sizes: dict[str, float] = {}
+    pages = []
+    for page in root.iter("page"):
+        blocks = []
+        links = []
+        for element in page:
+            if element.tag == "fontspec":
+                font_sizes[element.get("id")] = float(element.get("size", 0))
+            elif element.tag == "text":
+                text = "".join(element.itertext())
+                if not text.strip():
+                    continue
+                left, top = float(element.get("left")), float(element.get("top"))
+                bbox = [left, top, left + float(element.get("width")), top + float(element.get("height"))]
+                blocks.append({"text": text, "bbox": bbox, "font_size": font_sizes.get(element.get("font"), 0.0)})
+                for anchor in element.iter("a"):
+                    href = anchor.get("href", "")
+                    if href and not href.startswith("#"):
+                        links.append({"url": href, "text": "".join(anchor.itertext()).strip(), "bbox": bbox})
+        pages.append({
+            "width": float(page.get("width", 0)),
+            "height": float(page.get("height", 0)),
+            "blocks": blocks,
+            "links": links,
+        })
+    return pages
+
+
+def layout_text(blocks: list[dict]) -> str:
+    """Arrange text blocks into lines, approximating pdftotext -layout spacing.
+
+    Blocks whose vertical centers are within half a line height share a line.
+    Horizontal positions become space-padded columns using the median
+    character width on the page.
+    """
+    if not blocks:
+        return ""
+
+    char_width = statistics.median(
+        (b["bbox"][2] - b["bbox"][0]) / len(b["text"]) for b in blocks
+    ) or 1.0
+    page_left = min(b["bbox"][0] for b in blocks)
+
+    lines: list[list[dict]] = []
+    for block in sorted(blocks, key=lambda b: (b["bbox"][1], b["bbox"][0])):
+        center = (block["bbox"][1] + block["bbox"][3]) / 2
+        if lines:
+            last = lines[-1][0]["bbox"]
+            if abs(center - (last[1] + last[3]) / 2) <= (last[3] - last[1]) / 2:
+                lines[-1].append(block)
+                continue
+        lines.append([block])
+
+    text_lines = []
+    for line in lines:
+        text = ""
+        for block in sorted(line, key=lambda b: b["bbox"][0]):
+            column = round((block["bbox"][0] - page_left) / char_width)
+            text += " " * max(column - len(text), 1 if text else 0) + block["text"]
+        text_lines.append(text.rstrip())
+    return "\n".join(text_lines)
+
+
+def title_candidate(blocks: list[dict]) -> str | None:
+    """Return the text in the largest font on the page, joined in reading order."""
+    if not blocks:
+        return None
+    largest = max(b["font_size"] for b in blocks)
+    title_blocks = sorted(
+        (b for b in blocks if b["font_size"] == largest),
+        key=lambda b: (b["bbox"][1], b["bbox"][0]),
+    )
+    return " ".join(b["text"].strip() for b in title_blocks)
+
+
+def extract_slide_text(
+    pdf_path: str,
+    output_path: str,
+    images_dir: str | None = None,
+    image_ext: str | None = None,
+) -> str:
+    """Extract text from each PDF page into a markdown file and a JSON sidecar.
+
+    The sidecar has the same name as the markdown file with a .json suffix
+    (e.g. slide_ascii.json) and lists each slide's index, image path, title
+    candidate, text, text blocks with bounding boxes, and links.
 
     Args:
         pdf_path: Path to the PDF file.
         output_path: Path to write the output markdown file.
         images_dir: Optional path to slide images directory (for image references).
                     If provided, image references use paths relative to the output file.
+        image_ext: Extension of the slide images (e.g. "png"). If omitted, it is taken
+                   from slide_1.* in images_dir when that exists, else "png".
 
     Returns:
         The generated markdown content.
     """
     pdf = Path(pdf_path)
     out = Path(output_path)
+    sidecar = out.with_suffix(".json")
+    out.parent.mkdir(parents=True, exist_ok=True)
 
-    # Determine total page count by extracting all text and counting form feeds
-    try:
-        result = subprocess.run(
-            ["pdftotext", "-layout", str(pdf), "-"],
-            check=True, capture_output=True, text=True,
-        )
-    except FileNotFoundError:
-        raise FileNotFoundError(
-            "pdftotext not found. Install poppler:\n"
-            "  macOS: brew install poppler\n"
-            "  Ubuntu: apt-get install poppler-utils"
-        )
-
-    # Count pages from form feeds (pdftotext separates pages with \f)
-    all_text = result.stdout
-    pages = all_text.split("\f")
-    # pdftotext appends a trailing form feed, so the last element is empty
-    if pages and pages[-1].strip() == "":
-        pages = pages[:-1]
+    pages = parse_pdf_pages(str(pdf))
     num_pages = len(pages)
 
     if num_pages == 0:
         print("Warning: No pages found in PDF")
         out.write_text("")
+        sidecar.write_text(json.dumps({"pdf": pdf.name, "slides": []}, indent=2) + "\n")
         return ""
 
-    # Compute relative path from output file to images dir
+    # Compute relative path from output file to images dir, and match the image format used there
     img_rel = None
+    img_ext = image_ext or "png"
     if images_dir:
+        existing = sorted(Path(images_dir).glob("slide_1.*"))
+        if existing and not image_ext:
+            img_ext = existing[0].suffix.lstrip(".")
         try:
             img_rel = Path(images_dir).resolve().relative_to(out.resolve().parent)
         except ValueError:
             img_rel = Path(images_dir)
 
     lines: list[str] = []
-    for i, page_text in enumerate(pages, start=1):
-        text = page_text.strip()
+    slides: list[dict] = []
+    for i, page in enumerate(pages, start=1):
+        text = (page["text"] if "text" in page else layout_text(page["blocks"])).strip()
+        image = f"{img_rel}/slide_{i}.{img_ext}" if img_rel else f"slide_images/slide_{i}.png"
         lines.append(f"## Slide {i}")
         lines.append("")
-        if img_rel:
-            lines.append(f"![Slide {i}]({img_rel}/slide_{i}.png)")
-        else:
-            lines.append(f"![Slide {i}](slide_images/slide_{i}.png)")
+        lines.append(f"![Slide {i}]({image})")
         lines.append("")
         lines.append("```")
         lines.append(text if text else "(no extractable text)")
         lines.append("```")
         lines.append("")
+        slides.append({
+            "index": i,
+            "image": image,
+            "title": title_candidate(page["blocks"]),
+            "text": text,
+            "width": page["width"],
+            "height": page["height"],
+            "blocks": page["blocks"],
+            "links": page["links"],
+        })
 
     content = "\n".join(lines)
-    out.parent.mkdir(parents=True, exist_ok=True)
     out.write_text(content)
+    sidecar.write_text(json.dumps({"pdf": pdf.name, "slides": slides}, indent=2) + "\n")
     return content
 
 
 def main():
     if len(sys.argv) < 3:
-        print("Usage: uv run extract_slide_text.py <pdf_path> <output_path> [images_dir]")
+        print("Usage: uv run extract_slide_text.py <pdf_path> <output_path> [images_dir] [image_ext]")
         sys.exit(1)
 
     pdf_path = sys.argv[1]
     output_path = sys.argv[2]
     images_dir = sys.argv[3] if len(sys.argv) > 3 else None
+    image_ext = sys.argv[4].lstrip(".") if len(sys.argv) > 4 else None
 
     if not Path(pdf_path).exists():
         print(f"Error: PDF file not found: {pdf_path}")
         sys.exit(1)
 
-    extract_slide_text(pdf_path, output_path, images_dir)
+    extract_slide_text(pdf_path, output_path, images_dir, image_ext)
 
     # Count slides in output
     content = Path(output_path).read_text()
     num_slides = content.count("## Slide ")
     print(f"Extracted text from {num_slides} slides to {output_path}")
+    print(f"Slide layout and links written to {Path(output_path).with_suffix('.json')}")
 
 
 if __name__ == "__main__":
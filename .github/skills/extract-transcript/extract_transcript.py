@@ -1,20 +1,44 @@
 # /// script
 # requires-python = ">=3.11"
 # dependencies = [
+#     "requests",
 #     "youtube-transcript-api",
 # ]
 # ///
-"""Extract a timestamped transcript from a YouTube video."""
+"""Extract a timestamped transcript from a YouTube video.
 
+Raw transcript snippets are cached by video ID and language, so a video's
+transcript is fetched from YouTube only once. Several videos can be fetched
+in one run, over one shared HTTP session.
+"""
+
+import argparse
+import json
+import os
+import random
 import re
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from youtube_transcript_api import YouTubeTranscriptApi
+import requests
+from youtube_transcript_api import (
+    CouldNotRetrieveTranscript,
+    RequestBlocked,
+    YouTubeRequestFailed,
+    YouTubeTranscriptApi,
+)
 
+TRANSCRIPT_CACHE_DIR = Path.home() / ".cache" / "presentation-writeups" / "transcripts"
+DEFAULT_LANGUAGES = ("en",)
+# Errors that are likely to go away if we wait (rate limiting, transient HTTP failures)
+RETRYABLE_ERRORS = (RequestBlocked, YouTubeRequestFailed, requests.ConnectionError, requests.Timeout)
 
-def transcribe(url: str) -> str:
-    """Get transcript from YouTube URL with timestamps."""
-    video_id = None
+
+def extract_video_id(url: str) -> str:
+    """Extract the video ID from a YouTube URL."""
     patterns = [
         r"(?:v=|/v/|youtu\.be/)([^&?/]+)",
         r"(?:embed/)([^&?/]+)",
@@ -22,46 +46,203 @@ def transcribe(url: str) -> str:
     for pattern in patterns:
         match = re.search(pattern, url)
         if match:
-            video_id = match.group(1)
+            return match.group(1)
+    raise ValueError(f"Could not extract video ID from URL: {url}")
+
+
+def create_api(pool_size: int = 4) -> YouTubeTranscriptApi:
+    """Create a transcript client whose requests share one pooled HTTP session."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return YouTubeTranscriptApi(http_client=session)
+
+
+def cache_path(cache_dir: Path, video_id: str, language: str) -> Path:
+    return cache_dir / f"{video_id}.{language}.jsonl"
+
+
+def load_cached_snippets(cache_dir: Path, video_id: str, languages: tuple[str, ...]) -> list[dict] | None:
+    """Return cached snippets for the first requested language that is cached, if any."""
+    for language in languages:
+        path = cache_path(cache_dir, video_id, language)
+        if path.exists():
+            with path.open() as f:
+                return [json.loads(line) for line in f if line.strip()]
+    return None
+
+
+def save_snippets(cache_dir: Path, video_id: str, language: str, snippets: list[dict]) -> None:
+    """Write snippets as JSONL, one {"start", "duration", "text"} object per line.
+
+    The file is written to a temporary name and renamed, so concurrent
+    readers never see a partial transcript.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        for snippet in snippets:
+            f.write(json.dumps(snippet, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp_name, cache_path(cache_dir, video_id, language))
+
+
+def fetch_snippets(
+    ytt_api: YouTubeTranscriptApi,
+    video_id: str,
+    languages: tuple[str, ...],
+    retries: int = 4,
+    backoff: float = 2.0,
+) -> tuple[str, list[dict]]:
+    """Fetch a transcript from YouTube, retrying with exponential backoff.
+
+    Returns (language_code, snippets).
+    """
+    for attempt in range(retries + 1):
+        try:
+            transcript = ytt_api.fetch(video_id, languages=languages)
             break
+        except RETRYABLE_ERRORS as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2**attempt * random.uniform(0.5, 1.5)
+            print(f"Transcript request for {video_id} failed ({type(e).__name__}), retrying in {delay:.1f}s", file=sys.stderr)
+            time.sleep(delay)
+
+    snippets = [
+        {"start": round(s.start, 3), "duration": round(s.duration, 3), "text": s.text}
+        for s in transcript.snippets
+    ]
+    return transcript.language_code, snippets
+
 
-    if not video_id:
-        raise ValueError(f"Could not extract video ID from URL: {url}")
+def get_snippets(
+    video_id: str,
+    languages: tuple[str, ...] = DEFAULT_LANGUAGES,
+    ytt_api: YouTubeTranscriptApi | None = None,
+    cache_dir: Path | None = TRANSCRIPT_CACHE_DIR,
+) -> list[dict]:
+    """Return a video's transcript snippets, from the cache or from YouTube.
 
-    ytt_api = YouTubeTranscriptApi()
-    transcript = ytt_api.fetch(video_id)
+    Pass cache_dir=None to bypass the cache.
+    """
+    if cache_dir is not None:
+        cached = load_cached_snippets(cache_dir, video_id, languages)
+        if cached is not None:
+            return cached
 
+    language, snippets = fetch_snippets(ytt_api or create_api(), video_id, languages)
+    if cache_dir is not None:
+        save_snippets(cache_dir, video_id, language, snippets)
+    return snippets
+
+
+def format_transcript(snippets: list[dict]) -> str:
+    """Format snippets as [MM:SS] or [HH:MM:SS] lines."""
     lines = []
-    for snippet in transcript:
-        start = int(snippet.start)
+    for snippet in snippets:
+        start = int(snippet["start"])
         hours, remainder = divmod(start, 3600)
         minutes, seconds = divmod(remainder, 60)
         if hours > 0:
             timestamp = f"[{hours:02d}:{minutes:02d}:{seconds:02d}]"
         else:
             timestamp = f"[{minutes:02d}:{seconds:02d}]"
-        lines.append(f"{timestamp} {snippet.text}")
+        lines.append(f"{timestamp} {snippet['text']}")
 
     return "\n".join(lines)
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: uv run extract_transcript.py <youtube_url> [output_file]")
-        sys.exit(1)
+def transcribe(
+    url: str,
+    languages: tuple[str, ...] = DEFAULT_LANGUAGES,
+    ytt_api: YouTubeTranscriptApi | None = None,
+    cache_dir: Path | None = TRANSCRIPT_CACHE_DIR,
+) -> str:
+    """Get transcript from YouTube URL with timestamps."""
+    return format_transcript(get_snippets(extract_video_id(url), languages, ytt_api, cache_dir))
 
-    url = sys.argv[1]
-    result = transcribe(url)
 
-    if len(sys.argv) >= 3:
-        from pathlib import Path
+def transcribe_batch(
+    jobs: list[tuple[str, str]],
+    languages: tuple[str, ...] = DEFAULT_LANGUAGES,
+    concurrency: int = 4,
+    cache_dir: Path | None = TRANSCRIPT_CACHE_DIR,
+) -> list[tuple[str, str | None, Exception | None]]:
+    """Fetch transcripts for several (url, output_file) jobs over one shared session.
 
-        output_path = Path(sys.argv[2])
+    At most `concurrency` requests go to YouTube at once. Cached transcripts
+    are written without any request. A failure in one job does not stop the
+    others. Returns (url, output_file or None, error or None) per job, in order.
+    """
+    ytt_api = create_api(concurrency)
+
+    def run(job: tuple[str, str]) -> tuple[str, str | None, Exception | None]:
+        url, output_file = job
+        try:
+            text = transcribe(url, languages, ytt_api, cache_dir)
+        except (ValueError, CouldNotRetrieveTranscript, requests.RequestException) as e:
+            return url, None, e
+        output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(result)
-        print(f"Transcript saved to: {output_path}")
-    else:
-        print(result)
+        output_path.write_text(text)
+        return url, output_file, None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract timestamped transcripts from YouTube videos")
+    parser.add_argument(
+        "args",
+        nargs="+",
+        metavar="URL [OUTPUT_FILE]",
+        help="A YouTube URL and optional output file, or several <url> <output_file> pairs",
+    )
+    parser.add_argument(
+        "--language",
+        action="append",
+        help="Preferred transcript language, in priority order; repeat for fallbacks (default: en)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum transcripts fetched from YouTube at once (default: 4)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(TRANSCRIPT_CACHE_DIR),
+        help=f"Cache of raw transcript snippets, reused across runs (default: {TRANSCRIPT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch from YouTube, without reading or updating the cache",
+    )
+    args = parser.parse_args()
+
+    languages = tuple(args.language or DEFAULT_LANGUAGES)
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
+
+    if len(args.args) == 1:
+        print(transcribe(args.args[0], languages, cache_dir=cache_dir))
+        return
+
+    if len(args.args) % 2:
+        print("Usage: uv run extract_transcript.py <youtube_url> [output_file] [<youtube_url> <output_file> ...]")
+        sys.exit(1)
+
+    jobs = list(zip(args.args[::2], args.args[1::2]))
+    failed = 0
+    for url, output_file, error in transcribe_batch(jobs, languages, args.concurrency, cache_dir):
+        if error:
+            failed += 1
+            print(f"Failed to get transcript for {url}: {error}", file=sys.stderr)
+        else:
+            print(f"Transcript saved to: {output_file}")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
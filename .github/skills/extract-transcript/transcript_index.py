@@ -0,0 +1,222 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+"""Time-indexed view of a transcript for fast range, point, and keyword lookups.
+
+Builds from the [MM:SS] / [HH:MM:SS] lines written by extract_transcript.py,
+or from its cached snippets, so later steps can pull just the part of the
+transcript they need instead of the whole file.
+"""
+
+import argparse
+import json
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from pathlib import Path
+
+TIMESTAMP_LINE = re.compile(r"^\[(\d+(?::\d{2}){1,2})\]\s?(.*)$")
+WORD = re.compile(r"[\w']+")
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse "HH:MM:SS", "MM:SS", or plain seconds into seconds."""
+    seconds = 0.0
+    for part in value.strip("[]").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds the way extract_transcript.py does: [MM:SS] or [HH:MM:SS]."""
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours > 0:
+        return f"[{hours:02d}:{minutes:02d}:{secs:02d}]"
+    return f"[{minutes:02d}:{secs:02d}]"
+
+
+class TranscriptIndex:
+    """Transcript segments with sorted start times, queried by binary search.
+
+    Start and end times live in flat float arrays; segment i spans
+    [starts[i], ends[i]). Keyword search uses an inverted index from each
+    lowercased word to the sorted list of segments containing it.
+
+    YouTube snippets often overlap, but the lookups need segments that do
+    not, so each end is clamped to the next later start (segments that share
+    a start share the time up to the next one). The last segment runs until
+    the latest end of any segment.
+    """
+
+    def __init__(self, starts: list[float], ends: list[float], texts: list[str]):
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        self.starts = array("d", (starts[i] for i in order))
+        self.ends = array("d", (ends[i] for i in order))
+        self.texts = [texts[i] for i in order]
+        group = 0
+        for i in range(1, len(self.starts) + 1):
+            if i < len(self.starts) and self.starts[i] == self.starts[group]:
+                continue
+            end = max(self.ends[group:i])
+            if i < len(self.starts):
+                end = min(end, self.starts[i])
+            else:
+                end = max(ends)
+            for j in range(group, i):
+                self.ends[j] = end
+            group = i
+        self.words: dict[str, list[int]] = defaultdict(list)
+        for i, text in enumerate(self.texts):
+            for word in dict.fromkeys(WORD.findall(text.lower())):
+                self.words[word].append(i)
+
+    @classmethod
+    def from_text(cls, text: str) -> "TranscriptIndex":
+        """Build from extract_transcript.py output.
+
+        Each segment ends where the next one starts; the last segment gets
+        the median segment length. Lines without a timestamp continue the
+        previous segment.
+        """
+        starts: list[float] = []
+        texts: list[str] = []
+        for line in text.splitlines():
+            match = TIMESTAMP_LINE.match(line.strip())
+            if match:
+                starts.append(parse_timestamp(match.group(1)))
+                texts.append(match.group(2))
+            elif texts and line.strip():
+                texts[-1] += " " + line.strip()
+
+        ends = starts[1:]
+        if starts:
+            gaps = sorted(b - a for a, b in zip(starts, ends)) or [0.0]
+            ends.append(starts[-1] + max(gaps[len(gaps) // 2], 1.0))
+        return cls(starts, ends, texts)
+
+    @classmethod
+    def from_snippets(cls, snippets: list[dict]) -> "TranscriptIndex":
+        """Build from extract_transcript snippets ({"start", "duration", "text"} dicts).
+
+        Overlapping snippets are clamped, so each moment falls in one segment:
+
+        >>> index = TranscriptIndex.from_snippets([
+        ...     {"start": 0.0, "duration": 4.0, "text": "hello"},
+        ...     {"start": 2.0, "duration": 4.0, "text": "world"},
+        ... ])
+        >>> index.at(3.0)["text"], index.text_between(1.0, 3.0)
+        ('world', 'hello world')
+        """
+        return cls(
+            [s["start"] for s in snippets],
+            [s["start"] + s["duration"] for s in snippets],
+            [s["text"] for s in snippets],
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TranscriptIndex":
+        """Load a transcript.txt file, or a cached .jsonl snippets file."""
+        path = Path(path)
+        if path.suffix == ".jsonl":
+            with path.open() as f:
+                return cls.from_snippets([json.loads(line) for line in f if line.strip()])
+        return cls.from_text(path.read_text())
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def segment(self, i: int) -> dict:
+        return {"start": self.starts[i], "end": self.ends[i], "text": self.texts[i]}
+
+    def index_at(self, t: float) -> int | None:
+        """Index of the segment being spoken at time t, or None if t falls in a gap."""
+        i = bisect_right(self.starts, t) - 1
+        if i >= 0 and t < self.ends[i]:
+            return i
+        return None
+
+    def at(self, t: float) -> dict | None:
+        """The segment being spoken at time t."""
+        i = self.index_at(t)
+        return None if i is None else self.segment(i)
+
+    def range_indices(self, t1: float, t2: float) -> range:
+        """Indices of segments that overlap [t1, t2)."""
+        hi = bisect_left(self.starts, t2)
+        lo = bisect_right(self.starts, t1) - 1
+        if lo < 0 or self.ends[lo] <= t1:
+            lo += 1
+        else:
+            # Segments that share this start run as long as it does
+            lo = bisect_left(self.starts, self.starts[lo])
+        return range(lo, max(lo, hi))
+
+    def between(self, t1: float, t2: float) -> list[dict]:
+        """Segments that overlap [t1, t2)."""
+        return [self.segment(i) for i in self.range_indices(t1, t2)]
+
+    def text_between(self, t1: float, t2: float) -> str:
+        """The spoken text between t1 and t2, joined into one string."""
+        return " ".join(self.texts[i] for i in self.range_indices(t1, t2))
+
+    def search(self, keyword: str, t1: float | None = None, t2: float | None = None) -> list[dict]:
+        """Segments containing every word of keyword, optionally limited to [t1, t2).
+
+        A multi-word keyword also has to appear as a phrase within the segment.
+        """
+        words = WORD.findall(keyword.lower())
+        if not words:
+            return []
+        postings = sorted((self.words.get(word, []) for word in words), key=len)
+        matches = postings[0]
+        if t1 is not None or t2 is not None:
+            # Postings are sorted by segment index, which is also time order
+            span = self.range_indices(t1 if t1 is not None else float("-inf"), t2 if t2 is not None else float("inf"))
+            matches = matches[bisect_left(matches, span.start):bisect_left(matches, span.stop)]
+        for other in postings[1:]:
+            other_set = set(other)
+            matches = [i for i in matches if i in other_set]
+        if len(words) > 1:
+            phrase = " ".join(words)
+            matches = [i for i in matches if phrase in " ".join(WORD.findall(self.texts[i].lower()))]
+        return [self.segment(i) for i in matches]
+
+    def format(self, segments: list[dict]) -> str:
+        """Format segments back into transcript lines."""
+        return "\n".join(f"{format_timestamp(s['start'])} {s['text']}" for s in segments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a transcript by time range, time, or keyword")
+    parser.add_argument("transcript", help="transcript.txt from extract_transcript.py, or a cached .jsonl file")
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument("--between", nargs=2, metavar=("START", "END"), help="Print segments between two times (MM:SS, HH:MM:SS, or seconds)")
+    query.add_argument("--at", metavar="TIME", help="Print the segment spoken at a time")
+    query.add_argument("--search", metavar="KEYWORD", help="Print segments containing a word or phrase")
+    args = parser.parse_args()
+
+    if not Path(args.transcript).exists():
+        print(f"Error: transcript not found: {args.transcript}")
+        sys.exit(1)
+
+    index = TranscriptIndex.load(args.transcript)
+    if args.between:
+        segments = index.between(parse_timestamp(args.between[0]), parse_timestamp(args.between[1]))
+    elif args.at:
+        segment = index.at(parse_timestamp(args.at))
+        segments = [segment] if segment else []
+    else:
+        segments = index.search(args.search)
+
+    if segments:
+        print(index.format(segments))
+    else:
+        print("No matching transcript segments")
+
+
+if __name__ == "__main__":
+    main()
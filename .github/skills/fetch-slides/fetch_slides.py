@@ -1,26 +1,270 @@
 # /// script
 # requires-python = ">=3.11"
 # dependencies = [
-#     "httpx",
+#     "httpx[http2]",
 #     "playwright",
 # ]
 # ///
 """Fetch presentation slides from a URL and convert to PDF."""
 
+import argparse
+import asyncio
+import codecs
+import hashlib
+import json
 import logging
+import os
+import queue
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
 from html.parser import HTMLParser
 from pathlib import Path
+from typing import TextIO
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
 import httpx
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+SLIDES_CACHE_DIR = Path.home() / ".cache" / "presentation-writeups" / "slides"
+# Where download_slides writes each kind of source file
+SOURCE_PATHS = {"pdf": "pdf_path", "pptx": "pptx_path", "html": "html_path"}
+REVEAL_READY_TIMEOUT_MS = 15000
+
+# Resolves true once RevealJS has laid out the deck (in print-pdf mode, once it
+# fires "pdf-ready") and web fonts are loaded, or false if the page never
+# initializes RevealJS within the timeout. reveal.js 4+ has Reveal.on; 3.x
+# only has Reveal.addEventListener.
+REVEAL_READY_JS = """
+(timeoutMs) => new Promise((resolve) => {
+  const done = (ready) => document.fonts.ready.then(() => resolve(ready));
+  setTimeout(() => resolve(false), timeoutMs);
+  const waitForReveal = () => {
+    const reveal = window.Reveal;
+    const on = reveal && (reveal.on || reveal.addEventListener);
+    if (typeof on !== "function") {
+      return setTimeout(waitForReveal, 100);
+    }
+    const printing = /print-pdf/i.test(window.location.search);
+    if (printing && document.querySelector(".pdf-page")) return done(true);
+    if (!printing && reveal.isReady && reveal.isReady()) return done(true);
+    on.call(reveal, printing ? "pdf-ready" : "ready", () => done(true));
+  };
+  waitForReveal();
+})
+"""
+
+
+def create_client() -> httpx.Client:
+    """Create the HTTP client shared by every request in a fetch.
+
+    One pooled client keeps connections alive (and multiplexed over HTTP/2)
+    across the content-type check, downloads, and redirects.
+    """
+    return httpx.Client(
+        http2=True,
+        follow_redirects=True,
+        timeout=httpx.Timeout(60.0, connect=10.0),
+        limits=httpx.Limits(max_keepalive_connections=10),
+    )
+
+
+def download_to_file(
+    response: httpx.Response,
+    path: Path,
+    on_chunk: Callable[[bytes], None] | None = None,
+) -> str:
+    """Stream a response body to disk in chunks instead of buffering it in memory.
+
+    The body is written to <name>.part and renamed to path only once it has
+    fully arrived, so an interrupted download never leaves a truncated file
+    that looks finished. If on_chunk is given, it also receives every chunk
+    as it arrives. Returns the SHA-256 hex digest of the body.
+    """
+    digest = hashlib.sha256()
+    part_path = path.with_name(path.name + ".part")
+    try:
+        with part_path.open("wb") as f:
+            for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+        os.replace(part_path, path)
+    finally:
+        part_path.unlink(missing_ok=True)
+    logger.info(f"Saved {path.stat().st_size} bytes to: {path}")
+    return digest.hexdigest()
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on the lock file at path, using flock on POSIX and msvcrt on Windows."""
+    with path.open("w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+            return
+        while True:
+            try:
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                # LK_LOCK gives up after about 10 seconds; keep waiting
+                continue
+        try:
+            yield
+        finally:
+            msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SlidesCache:
+    """Shared on-disk cache of downloaded slides and their converted PDFs.
+
+    Files are stored by the SHA-256 of their content under objects/, so decks
+    referenced by several presentations are stored (and converted) once.
+    index.json maps each URL to its last ETag/Last-Modified and source hash,
+    and each source hash to the hash of its converted PDF. Objects are evicted
+    least recently used first once the cache exceeds max_bytes.
+
+    Several fetches may share the cache at once. Objects and the index are
+    written through temporary files, saving merges this run's entries into
+    the index on disk under a file lock, and an object evicted by another
+    run is treated as a cache miss.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.objects_dir = cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = cache_dir / "index.json"
+        self.lock_path = cache_dir / "index.lock"
+        self.max_bytes = max_bytes
+        self.index = self.read_index()
+        # Entries added by this run, merged into the index on disk by save()
+        self.updates: dict[str, dict] = {"urls": {}, "pdfs": {}}
+
+    def read_index(self) -> dict:
+        if self.index_path.exists():
+            try:
+                return json.loads(self.index_path.read_text())
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring unreadable cache index: {self.index_path}")
+        return {"urls": {}, "pdfs": {}}
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Return If-None-Match/If-Modified-Since headers for a cached URL."""
+        entry = self.index["urls"].get(url)
+        if not entry or not self.object_path(entry["source"]).exists():
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def object_path(self, sha: str) -> Path:
+        """Return where the file with the given content hash is stored."""
+        return self.objects_dir / sha
+
+    def lookup(self, url: str) -> dict | None:
+        """Return the cache entry for a URL (kind, source hash, validators)."""
+        return self.index["urls"].get(url)
+
+    def store_object(self, path: Path, sha: str) -> None:
+        """Copy a file into objects/ under its hash, unless it is already there."""
+        target = self.object_path(sha)
+        if target.exists():
+            return
+        # Dot-prefixed temporary names are never evicted or read as objects
+        fd, tmp_name = tempfile.mkstemp(dir=self.objects_dir, prefix=".")
+        os.close(fd)
+        shutil.copyfile(path, tmp_name)
+        os.replace(tmp_name, target)
+
+    def store_source(self, url: str, final_url: str, kind: str, path: Path, sha: str, headers: httpx.Headers) -> None:
+        """Record a freshly downloaded source file and its validators."""
+        self.store_object(path, sha)
+        entry = {
+            "kind": kind,
+            "final_url": final_url,
+            "source": sha,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+        }
+        self.index["urls"][url] = self.updates["urls"][url] = entry
+
+    def copy_object(self, sha: str, path: Path) -> bool:
+        """Copy a cached object to path. Returns False if it has been evicted."""
+        try:
+            shutil.copyfile(self.object_path(sha), path)
+            self.object_path(sha).touch()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def copy_source(self, sha: str, path: Path) -> bool:
+        """Copy a cached source file to path, if it is still cached."""
+        return self.copy_object(sha, path)
+
+    def copy_pdf(self, source_sha: str, pdf_path: Path) -> bool:
+        """Copy the cached PDF converted from source_sha to pdf_path, if there is one."""
+        pdf_sha = self.index["pdfs"].get(source_sha)
+        return bool(pdf_sha) and self.copy_object(pdf_sha, pdf_path)
+
+    def store_pdf(self, source_sha: str, pdf_path: Path) -> None:
+        """Record the PDF converted from source_sha."""
+        pdf_sha = hashlib.sha256(pdf_path.read_bytes()).hexdigest()
+        self.store_object(pdf_path, pdf_sha)
+        self.index["pdfs"][source_sha] = self.updates["pdfs"][source_sha] = pdf_sha
+
+    def save(self) -> None:
+        """Evict least recently used objects over the size cap and merge this run's entries into the index."""
+        with file_lock(self.lock_path):
+            objects = []
+            for path in self.objects_dir.iterdir():
+                if not path.name.startswith("."):
+                    stat = path.stat()
+                    objects.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in objects)
+            for _, size, obj in sorted(objects):
+                if total <= self.max_bytes:
+                    break
+                total -= size
+                obj.unlink(missing_ok=True)
+                logger.info(f"Evicted {obj.name} from the slides cache")
+
+            # Other runs may have saved since this one read the index
+            index = self.read_index()
+            index["urls"].update(self.updates["urls"])
+            index["pdfs"].update(self.updates["pdfs"])
+            live = {p.name for p in self.objects_dir.iterdir()}
+            index["urls"] = {url: e for url, e in index["urls"].items() if e["source"] in live}
+            index["pdfs"] = {src: pdf for src, pdf in index["pdfs"].items() if pdf in live}
+
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(index, indent=2) + "\n")
+            os.replace(tmp_name, self.index_path)
+        self.index = index
+        self.updates = {"urls": {}, "pdfs": {}}
+
 
 def is_onedrive_url(url: str) -> bool:
     """Check if URL is a OneDrive sharing link."""
@@ -36,12 +280,8 @@ def get_onedrive_download_url(url: str) -> str:
     return urlunparse(parsed._replace(query=new_query))
 
 
-def convert_pptx_to_pdf(pptx_path: str, output_path: str) -> str:
-    """Convert a PPTX file to PDF using LibreOffice."""
-    pptx_path = Path(pptx_path)
-    output_path = Path(output_path)
-    output_dir = output_path.parent
-
+def find_soffice() -> str:
+    """Locate the LibreOffice executable."""
     soffice_paths = [
         "/Applications/LibreOffice.app/Contents/MacOS/soffice",
         "/usr/bin/soffice",
@@ -50,229 +290,594 @@ def convert_pptx_to_pdf(pptx_path: str, output_path: str) -> str:
         shutil.which("libreoffice"),
     ]
 
-    soffice = None
     for path in soffice_paths:
         if path and Path(path).exists():
-            soffice = path
-            break
-
-    if not soffice:
-        raise FileNotFoundError(
-            "LibreOffice not found. Install it:\n"
-            "  macOS: brew install --cask libreoffice\n"
-            "  Ubuntu: apt-get install libreoffice"
-        )
-
-    logger.info(f"Converting PPTX to PDF using LibreOffice: {soffice}")
-
-    cmd = [
-        soffice,
-        "--headless",
-        "--convert-to",
-        "pdf",
-        "--outdir",
-        str(output_dir),
-        str(pptx_path),
-    ]
+            return path
+
+    raise FileNotFoundError(
+        "LibreOffice not found. Install it:\n"
+        "  macOS: brew install --cask libreoffice\n"
+        "  Ubuntu: apt-get install libreoffice"
+    )
+
+
+class PptxConverterPool:
+    """Pool of headless LibreOffice workers converting PPTX files to PDF.
+
+    Each worker thread owns a LibreOffice profile directory, so workers never
+    contend for the same profile lock and run truly in parallel. A worker takes
+    every job waiting in the queue (up to batch_size) and converts them with a
+    single soffice invocation, so LibreOffice's startup cost is paid once per
+    batch rather than once per file, and the profile is initialized only once
+    per worker.
+    """
+
+    def __init__(self, workers: int = 2, batch_size: int = 8):
+        self.soffice = find_soffice()
+        logger.info(f"Converting PPTX to PDF using LibreOffice: {self.soffice} ({workers} workers)")
+        self.batch_size = batch_size
+        self.jobs: queue.Queue = queue.Queue()
+        self.root = Path(tempfile.mkdtemp(prefix="soffice-pool-"))
+        self.threads = [
+            threading.Thread(target=self._work, args=(self.root / f"worker-{i}",), daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, pptx_path: str, output_path: str) -> Future:
+        """Queue a conversion. The future resolves to output_path."""
+        future: Future = Future()
+        self.jobs.put((Path(pptx_path), Path(output_path), future))
+        return future
+
+    def close(self) -> None:
+        """Finish queued conversions, stop the workers, and delete their profiles."""
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> "PptxConverterPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _work(self, worker_dir: Path) -> None:
+        profile_url = (worker_dir / "profile").as_uri()
+        while (job := self.jobs.get()) is not None:
+            batch = [job]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                batch.append(job)
+            self._run_batch(batch, worker_dir, profile_url)
+            if stop:
+                break
+
+    def _run_batch(self, batch: list[tuple[Path, Path, Future]], worker_dir: Path, profile_url: str) -> None:
+        """Convert a batch, failing any future it leaves unresolved instead of killing the worker."""
+        try:
+            self._convert(batch, worker_dir, profile_url)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _convert(self, batch: list[tuple[Path, Path, Future]], worker_dir: Path, profile_url: str) -> None:
+        # Inputs are renamed job-N.pptx so decks with the same file name can share a batch
+        work_dir = worker_dir / "batch"
+        shutil.rmtree(work_dir, ignore_errors=True)
+        work_dir.mkdir(parents=True)
+        inputs = []
+        staged_batch = []
+        for job in batch:
+            staged = work_dir / f"job-{len(staged_batch)}.pptx"
+            try:
+                shutil.copyfile(job[0], staged)
+            except OSError as e:
+                job[2].set_exception(e)
+                continue
+            inputs.append(str(staged))
+            staged_batch.append(job)
+        batch = staged_batch
+        if not batch:
+            return
+
+        cmd = [
+            self.soffice,
+            f"-env:UserInstallation={profile_url}",
+            "--headless",
+            "--convert-to",
+            "pdf",
+            "--outdir",
+            str(work_dir),
+            *inputs,
+        ]
+        try:
+            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            logger.info(f"LibreOffice output: {result.stdout}")
+        except subprocess.CalledProcessError as e:
+            if len(batch) > 1:
+                # One bad deck should not fail the others, so convert each on its own
+                logger.warning(f"LibreOffice failed on a batch of {len(batch)} files, retrying them one at a time")
+                for job in batch:
+                    self._run_batch([job], worker_dir, profile_url)
+                return
+            batch[0][2].set_exception(RuntimeError(f"Failed to convert PPTX to PDF: {e.stderr}"))
+            return
+
+        missing = []
+        for n, job in enumerate(batch):
+            _, output_path, future = job
+            generated_pdf = work_dir / f"job-{n}.pdf"
+            if not generated_pdf.exists():
+                if len(batch) > 1:
+                    missing.append(job)
+                else:
+                    future.set_exception(FileNotFoundError(f"Expected PDF not found: {generated_pdf}"))
+                continue
+            shutil.move(generated_pdf, output_path)
+            logger.info(f"Saved PDF to: {output_path}")
+            future.set_result(str(output_path))
+        for job in missing:
+            self._run_batch([job], worker_dir, profile_url)
 
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        logger.info(f"LibreOffice output: {result.stdout}")
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Failed to convert PPTX to PDF: {e.stderr}")
-
-    generated_pdf = output_dir / f"{pptx_path.stem}.pdf"
-    if not generated_pdf.exists():
-        raise FileNotFoundError(f"Expected PDF not found: {generated_pdf}")
-
-    if generated_pdf != output_path:
-        generated_pdf.rename(output_path)
-
-    logger.info(f"Saved PDF to: {output_path}")
-    return str(output_path)
-
-
-def extract_revealjs_content(url: str, output_path: str) -> str:
-    """Extract text content and links from RevealJS slides."""
-    logger.info(f"Extracting RevealJS slide content from: {url}")
-
-    response = httpx.get(url, follow_redirects=True)
-    html = response.text
-
-    class SlideExtractor(HTMLParser):
-        def __init__(self):
-            super().__init__()
-            self.slides = []
-            self.current_slide = []
-            self.in_slides = False
-            self.in_section = False
-            self.is_heading_slide = False
-            self.section_depth = 0
-            self.current_tag = None
-            self.links = []
-
-        def handle_starttag(self, tag, attrs):
-            attrs_dict = dict(attrs)
-            self.current_tag = tag
-
-            if tag == "div" and "slides" in attrs_dict.get("class", ""):
-                self.in_slides = True
-            elif tag == "section" and self.in_slides:
-                if self.section_depth == 0:
-                    self.in_section = True
-                    self.current_slide = []
-                    self.links = []
-                    classes = attrs_dict.get("class", "")
-                    self.is_heading_slide = "heading" in classes
-                self.section_depth += 1
-            elif tag == "a" and self.in_section:
-                href = attrs_dict.get("href", "")
-                if href and not href.startswith("#"):
-                    self.links.append(href)
-            elif tag == "img" and self.in_section:
-                alt = attrs_dict.get("alt", "")
-                if alt:
-                    self.current_slide.append(f"[Image: {alt}]")
-
-        def handle_endtag(self, tag):
-            if tag == "section" and self.in_slides:
-                self.section_depth -= 1
-                if self.section_depth == 0 and self.in_section:
-                    self.in_section = False
-                    slide_content = " ".join(self.current_slide).strip()
-                    if slide_content or self.links:
-                        self.slides.append(
-                            {
-                                "content": slide_content,
-                                "links": self.links.copy(),
-                                "is_heading": self.is_heading_slide,
-                            }
-                        )
-                    self.is_heading_slide = False
-
-        def handle_data(self, data):
-            if self.in_section:
-                text = data.strip()
-                if text:
-                    self.current_slide.append(text)
-
-    parser = SlideExtractor()
-    parser.feed(html)
-
-    lines = ["# RevealJS Slide Content\n"]
-    for i, slide in enumerate(parser.slides, 1):
-        slide_type = "SECTION HEADING" if slide["is_heading"] else "Slide"
-        lines.append(f"## {slide_type} {i}\n")
-        if slide["content"]:
-            lines.append(slide["content"])
-            lines.append("")
-        if slide["links"]:
+
+def convert_pptx_to_pdf(pptx_path: str, output_path: str) -> str:
+    """Convert a PPTX file to PDF using LibreOffice."""
+    with PptxConverterPool(workers=1) as pool:
+        return pool.submit(pptx_path, output_path).result()
+
+
+class SlideExtractor(HTMLParser):
+    """Incremental RevealJS parser that writes each slide as soon as it closes.
+
+    Feed it the page in chunks; memory use depends on the largest slide, not
+    on the size of the deck. Nested <section> elements (vertical stacks) are
+    emitted as separate slides with their RevealJS #/h/v position, and
+    <aside class="notes"> content is kept as speaker notes.
+    """
+
+    def __init__(self, output: TextIO):
+        super().__init__()
+        self.output = output
+        self.output.write("# RevealJS Slide Content\n\n")
+        self.in_slides = False
+        self.sections: list[dict] = []
+        self.h_index = -1
+        self.notes_depth = 0
+        self.skip_depth = 0
+        self.slide_count = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs_dict = dict(attrs)
+        classes = (attrs_dict.get("class") or "").split()
+
+        if tag == "div" and "slides" in classes:
+            self.in_slides = True
+        elif tag == "section" and self.in_slides:
+            if self.sections:
+                parent = self.sections[-1]
+                parent["children"] += 1
+                position = (parent["position"][0], parent["children"] - 1)
+            else:
+                self.h_index += 1
+                position = (self.h_index, None)
+            self.sections.append({
+                "position": position,
+                "is_heading": "heading" in classes,
+                "content": [],
+                "links": [],
+                "notes": [],
+                "children": 0,
+            })
+        elif not self.sections:
+            return
+        self.break_text()
+        if tag in ("script", "style"):
+            self.skip_depth += 1
+        elif tag == "aside" and "notes" in classes:
+            self.notes_depth += 1
+        elif self.notes_depth:
+            self.notes_depth += tag == "aside"
+        elif tag == "a":
+            href = attrs_dict.get("href") or ""
+            if href and not href.startswith("#"):
+                self.sections[-1]["links"].append(href)
+        elif tag == "img":
+            alt = attrs_dict.get("alt", "")
+            if alt:
+                self.sections[-1]["content"].append(f"[Image: {alt}] ")
+
+    def handle_endtag(self, tag):
+        if not self.sections:
+            return
+        self.break_text()
+        if tag == "section":
+            section = self.sections.pop()
+            # A section with nested sections is a vertical stack; its children were already written
+            if not section["children"]:
+                self.write_slide(section)
+        elif tag in ("script", "style") and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == "aside" and self.notes_depth:
+            self.notes_depth -= 1
+
+    def handle_data(self, data):
+        # Text can arrive split across chunks, so keep it raw and normalize whitespace when writing
+        if self.sections and not self.skip_depth:
+            self.sections[-1]["notes" if self.notes_depth else "content"].append(data)
+
+    def break_text(self) -> None:
+        """Separate text on either side of a tag, as the words of adjacent elements."""
+        if self.sections:
+            self.sections[-1]["notes" if self.notes_depth else "content"].append(" ")
+
+    def write_slide(self, section: dict) -> None:
+        content = " ".join("".join(section["content"]).split())
+        notes = " ".join("".join(section["notes"]).split())
+        if not (content or section["links"] or notes):
+            return
+        self.slide_count += 1
+        h, v = section["position"]
+        slide_type = "SECTION HEADING" if section["is_heading"] else "Slide"
+        lines = [f"## {slide_type} {self.slide_count}\n", f"*Position: #/{h}{'' if v is None else f'/{v}'}*", ""]
+        if content:
+            lines += [content, ""]
+        if section["links"]:
             lines.append("**Links:**")
-            for link in slide["links"]:
-                lines.append(f"- {link}")
+            lines += [f"- {link}" for link in section["links"]]
             lines.append("")
+        if notes:
+            lines += ["**Notes:**", notes, ""]
+        self.output.write("\n".join(lines) + "\n")
+
+
+def extract_revealjs_content(html_path: str, output_path: str) -> str:
+    """Extract text content, links, and speaker notes from a downloaded RevealJS page.
+
+    The file is read and parsed in chunks, and slides are written to
+    output_path as they are parsed.
+    """
+    logger.info(f"Extracting RevealJS slide content from: {html_path}")
+
+    with open(html_path, errors="replace") as html, open(output_path, "w") as output:
+        parser = SlideExtractor(output)
+        while chunk := html.read(DOWNLOAD_CHUNK_SIZE):
+            parser.feed(chunk)
+        parser.close()
 
-    content = "\n".join(lines)
-    Path(output_path).write_text(content)
     logger.info(f"Saved slide content to: {output_path}")
     return output_path
 
 
-def fetch_revealjs_pdf(url: str, output_path: str) -> str:
-    """Fetch a RevealJS presentation as PDF using Playwright."""
+def get_print_url(url: str) -> str:
+    """Append RevealJS's ?print-pdf flag to a presentation URL."""
     parsed = urlparse(url)
     query_params = parse_qs(parsed.query)
     query_params["print-pdf"] = [""]
     new_query = urlencode(query_params, doseq=True).replace("print-pdf=", "print-pdf")
-    print_url = urlunparse(parsed._replace(query=new_query))
-
-    logger.info(f"Fetching RevealJS PDF from: {print_url}")
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        page.goto(print_url, wait_until="networkidle")
-        page.wait_for_timeout(2000)
-        page.pdf(
-            path=output_path,
-            format="Letter",
-            print_background=True,
-            prefer_css_page_size=True,
-        )
-        browser.close()
-
-    logger.info(f"Saved PDF to: {output_path}")
-    return output_path
+    return urlunparse(parsed._replace(query=new_query))
 
 
-def fetch_slides_from_url(url: str, output_dir: str) -> tuple[str, str | None]:
-    """Fetch slides from a URL, detecting whether it's a PDF, PPTX, or HTML (RevealJS)."""
+async def render_revealjs_pdfs(
+    jobs: list[tuple[str, str, str | None]],
+    concurrency: int = 4,
+    return_exceptions: bool = False,
+) -> list[str | BaseException]:
+    """Render several RevealJS presentations to PDF with one shared browser.
+
+    Each job is (url, output_path, html_path). A single Chromium instance is
+    launched, and up to `concurrency` decks render at once, each in its own
+    browser context. If html_path is given, the page itself is served from that
+    already downloaded file, and only its assets are fetched. Rendering starts
+    as soon as RevealJS reports it is ready, instead of after a fixed sleep.
+    With return_exceptions, a deck that fails to render is returned as its
+    exception instead of stopping the others.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def render(browser, url: str, output_path: str, html_path: str | None) -> str:
+        print_url = get_print_url(url)
+        async with semaphore:
+            logger.info(f"Fetching RevealJS PDF from: {print_url}")
+            context = await browser.new_context()
+            try:
+                page = await context.new_page()
+                if html_path:
+                    await page.route(
+                        lambda request_url: request_url == print_url,
+                        lambda route: route.fulfill(path=html_path, content_type="text/html; charset=utf-8"),
+                    )
+                await page.goto(print_url, wait_until="load")
+                if not await page.evaluate(REVEAL_READY_JS, REVEAL_READY_TIMEOUT_MS):
+                    logger.warning(f"No RevealJS ready event from {print_url}, waiting for network idle")
+                    await page.wait_for_load_state("networkidle")
+                await page.pdf(
+                    path=output_path,
+                    format="Letter",
+                    print_background=True,
+                    prefer_css_page_size=True,
+                )
+            finally:
+                await context.close()
+        logger.info(f"Saved PDF to: {output_path}")
+        return output_path
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        try:
+            return await asyncio.gather(*(render(browser, *job) for job in jobs), return_exceptions=return_exceptions)
+        finally:
+            await browser.close()
+
+
+def fetch_revealjs_pdf(url: str, output_path: str, html_path: str | None = None) -> str:
+    """Fetch a RevealJS presentation as PDF using Playwright.
+
+    If html_path is given, the page itself is served from that already
+    downloaded file, and only its assets (scripts, styles, images) are fetched.
+    """
+    return asyncio.run(render_revealjs_pdfs([(url, output_path, html_path)]))[0]
+
+
+def download_slides(
+    url: str,
+    output_dir: str,
+    client: httpx.Client,
+    cache: SlidesCache | None = None,
+    conditional: bool = True,
+) -> dict:
+    """Download slides from a URL, detecting whether it's a PDF, PPTX, or HTML (RevealJS).
+
+    The content type is read from a single streamed GET, and the body is
+    written straight to disk. If the URL is cached, the GET is conditional, and
+    a 304 Not Modified response copies the cached file instead (or downloads
+    it again without the condition, if it was evicted meanwhile). Conversion
+    to PDF is left to the caller.
+
+    Returns a dict with the detected "kind" (pdf, pptx, html or unknown), the
+    final "url" after redirects, the "source" content hash, and the output paths.
+    """
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
-    pdf_path = output_path / "slides.pdf"
-    pptx_path = output_path / "slides.pptx"
-    html_content_path = output_path / "slides_content.md"
-
-    if is_onedrive_url(url):
+    download = {
+        "url": url,
+        "source": None,
+        "pdf_path": str(output_path / "slides.pdf"),
+        "pptx_path": str(output_path / "slides.pptx"),
+        "html_path": str(output_path / "slides.html"),
+        "content_path": str(output_path / "slides_content.md"),
+    }
+
+    onedrive = is_onedrive_url(url)
+    if onedrive:
         download_url = get_onedrive_download_url(url)
         logger.info(f"Detected OneDrive URL, using download URL: {download_url}")
-
-        response = httpx.get(download_url, follow_redirects=True, timeout=60.0)
+    else:
+        download_url = url
+        logger.info(f"Checking content type for: {url}")
+
+    headers = cache.conditional_headers(url) if cache and conditional else {}
+    with client.stream("GET", download_url, headers=headers) as response:
+        if response.status_code == 304:
+            entry = cache.lookup(url)
+            if not cache.copy_source(entry["source"], Path(download[SOURCE_PATHS[entry["kind"]]])):
+                logger.info("Cached copy was evicted by another run, downloading again")
+                return download_slides(url, output_dir, client, cache, conditional=False)
+            logger.info(f"Not modified since last fetch, using cached {entry['kind'].upper()}")
+            download.update(kind=entry["kind"], source=entry["source"], url=entry["final_url"])
+            return download
+
+        response.raise_for_status()
         content_type = response.headers.get("content-type", "").lower()
 
         if "presentationml" in content_type or "pptx" in content_type:
-            logger.info("Detected PPTX, downloading and converting to PDF...")
-            pptx_path.write_bytes(response.content)
-            convert_pptx_to_pdf(str(pptx_path), str(pdf_path))
-            return str(pdf_path), None
+            logger.info("Detected PPTX, downloading...")
+            download["kind"] = "pptx"
         elif "application/pdf" in content_type:
-            logger.info("Detected PDF from OneDrive, downloading...")
-            pdf_path.write_bytes(response.content)
-            return str(pdf_path), None
-        else:
+            logger.info("Detected PDF, downloading directly...")
+            download["kind"] = "pdf"
+        elif onedrive:
             raise ValueError(f"Unexpected content type from OneDrive: {content_type}")
-
-    logger.info(f"Checking content type for: {url}")
-    response = httpx.head(url, follow_redirects=True)
-    content_type = response.headers.get("content-type", "").lower()
-
-    if "application/pdf" in content_type:
-        logger.info("Detected PDF, downloading directly...")
-        response = httpx.get(url, follow_redirects=True)
-        pdf_path.write_bytes(response.content)
-        logger.info(f"Saved PDF to: {pdf_path}")
-        return str(pdf_path), None
-    elif "presentationml" in content_type or "pptx" in content_type:
-        logger.info("Detected PPTX, downloading and converting to PDF...")
-        response = httpx.get(url, follow_redirects=True)
-        pptx_path.write_bytes(response.content)
-        convert_pptx_to_pdf(str(pptx_path), str(pdf_path))
-        return str(pdf_path), None
-    elif "text/html" in content_type:
-        logger.info("Detected HTML, treating as RevealJS presentation...")
-        fetch_revealjs_pdf(url, str(pdf_path))
-        extract_revealjs_content(url, str(html_content_path))
-        return str(pdf_path), str(html_content_path)
-    else:
-        logger.warning(
-            f"Unknown content type '{content_type}', attempting RevealJS fetch..."
-        )
-        fetch_revealjs_pdf(url, str(pdf_path))
-        return str(pdf_path), None
+        elif "text/html" in content_type:
+            logger.info("Detected HTML, treating as RevealJS presentation...")
+            download["url"] = str(response.url)
+            download["kind"] = "html"
+        else:
+            logger.warning(f"Unknown content type '{content_type}', attempting RevealJS fetch...")
+            download["kind"] = "unknown"
+            return download
+
+        source_path = Path(download[SOURCE_PATHS[download["kind"]]])
+        if download["kind"] == "html":
+            # Parse slides out of the page while it downloads
+            decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+            with open(download["content_path"], "w") as output:
+                parser = SlideExtractor(output)
+                download["source"] = download_to_file(
+                    response, source_path, lambda chunk: parser.feed(decoder.decode(chunk))
+                )
+                parser.feed(decoder.decode(b"", final=True))
+                parser.close()
+            download["content_extracted"] = True
+            logger.info(f"Saved slide content to: {download['content_path']}")
+        else:
+            download["source"] = download_to_file(response, source_path)
+        if cache:
+            cache.store_source(url, download["url"], download["kind"], source_path, download["source"], response.headers)
+
+    return download
+
+
+def fetch_slides_batch(
+    requests: list[tuple[str, str]],
+    client: httpx.Client | None = None,
+    concurrency: int = 4,
+    cache: SlidesCache | None = None,
+    soffice_workers: int = 2,
+) -> list[tuple[str, str | None]]:
+    """Fetch slides for many (url, output_dir) pairs and convert them to PDF.
+
+    Downloads share one HTTP client, all RevealJS decks are rendered by one
+    browser (see render_revealjs_pdfs) with up to `concurrency` at a time, and
+    PPTX files are converted by a PptxConverterPool of `soffice_workers`
+    LibreOffice workers while the RevealJS decks render.
+    With a cache, a source whose content was converted before (by any URL)
+    reuses the cached PDF instead of running LibreOffice or Playwright again.
+
+    Returns a (pdf_path, slides_content_path or None) tuple per request, in order.
+    If any deck fails, the others are still fetched and cached before the
+    error is raised (a RuntimeError listing every failed deck, when there
+    are several requests).
+    """
+    if client is None:
+        with create_client() as client:
+            return fetch_slides_batch(requests, client, concurrency, cache, soffice_workers)
+
+    # A deck that fails is reported after the others finish, and after the cache index is saved, so the
+    # objects already stored for the other decks stay indexed
+    errors: dict[str, BaseException] = {}
+    try:
+        downloads = []
+        for url, output_dir in requests:
+            try:
+                downloads.append(download_slides(url, output_dir, client, cache))
+            except Exception as e:
+                logger.error(f"Could not download {url}: {e}")
+                errors[url] = e
+
+        pending = []
+        for d in downloads:
+            if d["kind"] in ("pptx", "html") and cache and cache.copy_pdf(d["source"], Path(d["pdf_path"])):
+                logger.info(f"Reusing cached PDF converted from {d['url']}")
+            else:
+                pending.append(d)
+
+        pptx_jobs = [d for d in pending if d["kind"] == "pptx"]
+        render_downloads = [d for d in pending if d["kind"] in ("html", "unknown")]
+        render_jobs = [(d["url"], d["pdf_path"], d["html_path"] if d["kind"] == "html" else None) for d in render_downloads]
+        rendered = []
+        if pptx_jobs:
+            with PptxConverterPool(workers=min(soffice_workers, len(pptx_jobs))) as pool:
+                futures = [pool.submit(d["pptx_path"], d["pdf_path"]) for d in pptx_jobs]
+                if render_jobs:
+                    rendered = asyncio.run(render_revealjs_pdfs(render_jobs, concurrency, return_exceptions=True))
+                for d, future in zip(pptx_jobs, futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors[d["url"]] = e
+        elif render_jobs:
+            rendered = asyncio.run(render_revealjs_pdfs(render_jobs, concurrency, return_exceptions=True))
+        for d, result in zip(render_downloads, rendered):
+            if isinstance(result, BaseException):
+                errors[d["url"]] = result
+
+        for d in pending:
+            if cache and d["kind"] in ("pptx", "html") and d["url"] not in errors:
+                cache.store_pdf(d["source"], Path(d["pdf_path"]))
+
+        results = []
+        for d in downloads:
+            if d["url"] in errors:
+                continue
+            if d["kind"] == "html":
+                try:
+                    if not d.get("content_extracted"):
+                        extract_revealjs_content(d["html_path"], d["content_path"])
+                except Exception as e:
+                    errors[d["url"]] = e
+                    continue
+                results.append((d["pdf_path"], d["content_path"]))
+            else:
+                results.append((d["pdf_path"], None))
+    finally:
+        if cache:
+            cache.save()
+
+    if errors:
+        first_error = next(iter(errors.values()))
+        if len(requests) == 1:
+            raise first_error
+        failed = "\n".join(f"  {url}: {error}" for url, error in errors.items())
+        raise RuntimeError(f"Could not fetch slides for {len(errors)} of {len(requests)} decks:\n{failed}") from first_error
+    return results
+
+
+def fetch_slides_from_url(
+    url: str,
+    output_dir: str,
+    client: httpx.Client | None = None,
+    cache: SlidesCache | None = None,
+) -> tuple[str, str | None]:
+    """Fetch slides from a URL, detecting whether it's a PDF, PPTX, or HTML (RevealJS).
+
+    RevealJS HTML is downloaded once and reused for both the PDF render and
+    the content extraction.
+    """
+    return fetch_slides_batch([(url, output_dir)], client, cache=cache)[0]
 
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: uv run fetch_slides.py <url> <output_dir>")
+    parser = argparse.ArgumentParser(description="Fetch presentation slides from URLs and convert them to PDF")
+    parser.add_argument(
+        "pairs",
+        nargs="+",
+        metavar="URL OUTPUT_DIR",
+        help="One or more <url> <output_dir> pairs",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum RevealJS decks rendered at once (default: 4)",
+    )
+    parser.add_argument(
+        "--soffice-workers",
+        type=int,
+        default=2,
+        help="LibreOffice workers converting PPTX files in parallel (default: 2)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(SLIDES_CACHE_DIR),
+        help=f"Shared cache of downloaded and converted slides (default: {SLIDES_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=2048,
+        help="Evict least recently used cache files above this size (default: 2048)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download and convert, without reading or updating the cache",
+    )
+    args = parser.parse_args()
+
+    if len(args.pairs) % 2:
+        print("Usage: uv run fetch_slides.py <url> <output_dir> [<url> <output_dir> ...]")
         sys.exit(1)
 
-    url = sys.argv[1]
-    output_dir = sys.argv[2]
-
-    pdf_path, html_content_path = fetch_slides_from_url(url, output_dir)
-    print(f"PDF saved to: {pdf_path}")
-    if html_content_path:
-        print(f"Slide content saved to: {html_content_path}")
+    requests = list(zip(args.pairs[::2], args.pairs[1::2]))
+    cache = None if args.no_cache else SlidesCache(Path(args.cache_dir), args.cache_size_mb * 1024 * 1024)
+    for pdf_path, html_content_path in fetch_slides_batch(
+        requests, concurrency=args.concurrency, cache=cache, soffice_workers=args.soffice_workers
+    ):
+        print(f"PDF saved to: {pdf_path}")
+        if html_content_path:
+            print(f"Slide content saved to: {html_content_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "aiohttp",
+#     "azure-identity",
+#     "openai",
+#     "pillow",
+#     "python-dotenv",
+# ]
+# ///
+"""Outline a slide deck with one-sentence summaries, several slides per vision request.
+
+Slides are packed into batches by an estimated token budget. Each batch
+sends the downscaled slide images together with their extracted text, and
+the batches run in parallel. The summaries are written to outline.txt.
+"""
+
+import argparse
+import asyncio
+import base64
+import math
+import re
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / ".github" / "skills" / "align-slides"))
+from align_slides import load_slides  # noqa: E402
+from azure_openai_client import chat_completions_batch  # noqa: E402
+
+DEFAULT_TOKEN_BUDGET = 16000
+DEFAULT_MAX_SLIDES_PER_BATCH = 20
+# Rough allowances for the instructions, and for each slide's summary in the reply
+PROMPT_TOKENS = 400
+SUMMARY_TOKENS = 60
+MEDIA_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+
+INSTRUCTIONS = """You are outlining a presentation. For each slide below you get its extracted text and its image.
+Write a one-sentence summary describing the content of each slide. Base the summary primarily on the extracted text,
+which is ground truth for what the slide says; use the image only for visual context (diagrams, layout, screenshots),
+so embedded screenshots or demo captures are not mistaken for slide content.
+Reply with only a numbered list with one line per slide, using the slide numbers given ("12. Summary")."""
+
+
+def find_slide_images(images_dir: Path) -> dict[int, Path]:
+    """Map slide numbers to image files named slide_N.<ext>."""
+    images = {}
+    for path in images_dir.glob("slide_*.*"):
+        match = re.fullmatch(r"slide_(\d+)", path.stem)
+        if match and path.suffix.lower() in MEDIA_TYPES:
+            images[int(match.group(1))] = path
+    return dict(sorted(images.items()))
+
+
+def image_tokens(width: int, height: int, detail: str) -> int:
+    """Estimate the tokens a vision model charges for an image.
+
+    Low detail is a flat 85 tokens. High detail scales the image to fit in
+    2048x2048, then so its short side is at most 768, and charges 170 per
+    512px tile on top of the 85 base tokens.
+    """
+    if detail == "low":
+        return 85
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def pack_batches(costs: list[tuple[int, int]], token_budget: int, max_per_batch: int) -> list[list[int]]:
+    """Group (slide, tokens) pairs, in order, into batches that fit the token budget.
+
+    A slide that is over budget on its own still gets a batch of its own.
+    """
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    used = PROMPT_TOKENS
+    for slide, tokens in costs:
+        if batch and (used + tokens > token_budget or len(batch) == max_per_batch):
+            batches.append(batch)
+            batch, used = [], PROMPT_TOKENS
+        batch.append(slide)
+        used += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def batch_messages(slides: list[int], texts: dict[int, str], images: dict[int, Path], detail: str) -> list[dict]:
+    content = []
+    for slide in slides:
+        text = texts.get(slide) or "(no extractable text)"
+        content.append({"type": "text", "text": f"Slide {slide}\nExtracted text:\n```\n{text}\n```"})
+        image = images[slide]
+        data = base64.b64encode(image.read_bytes()).decode()
+        content.append({
+            "type": "image_url",
+            "image_url": {"url": f"data:{MEDIA_TYPES[image.suffix.lower()]};base64,{data}", "detail": detail},
+        })
+    return [{"role": "system", "content": INSTRUCTIONS}, {"role": "user", "content": content}]
+
+
+def parse_summaries(response: str | None) -> dict[int, str]:
+    summaries = {}
+    for line in (response or "").splitlines():
+        match = re.match(r"^\s*(\d+)\.\s+(.+)$", line)
+        if match:
+            summaries[int(match.group(1))] = match.group(2).strip()
+    return summaries
+
+
+async def outline_slides(
+    images_dir: str,
+    slide_text_path: str | None,
+    output_path: str,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_per_batch: int = DEFAULT_MAX_SLIDES_PER_BATCH,
+    detail: str = "high",
+    concurrency: int = 4,
+    semaphore: asyncio.Semaphore | None = None,
+) -> Path:
+    """Write outline.txt with a one-sentence summary per slide image in images_dir.
+
+    Slides missing from a batch's reply are retried once in new batches. If
+    any slide still has no summary, raises RuntimeError without writing the
+    outline. Pass a semaphore to share one request limit with other work.
+    """
+    images = find_slide_images(Path(images_dir))
+    if not images:
+        raise FileNotFoundError(f"No slide_N images found in {images_dir}")
+    texts = {}
+    if slide_text_path:
+        texts = {i: text for i, text in enumerate(load_slides(Path(slide_text_path)), start=1)}
+
+    costs = []
+    for slide, image in images.items():
+        with Image.open(image) as img:
+            tokens = image_tokens(img.width, img.height, detail)
+        costs.append((slide, tokens + len(texts.get(slide, "")) // 4 + SUMMARY_TOKENS))
+
+    summaries: dict[int, str] = {}
+    errors: list[str] = []
+    pending = costs
+    for _ in range(2):
+        batches = pack_batches(pending, token_budget, max_per_batch)
+        print(f"Outlining {len(pending)} slides in {len(batches)} requests")
+        results = await chat_completions_batch(
+            [batch_messages(batch, texts, images, detail) for batch in batches],
+            concurrency=concurrency,
+            temperature=0.2,
+            max_tokens=SUMMARY_TOKENS * max_per_batch + 200,
+            semaphore=semaphore,
+        )
+        for batch, result in zip(batches, results):
+            if result["error"]:
+                print(f"Warning: request for slides {batch[0]}-{batch[-1]} failed: {result['error']}", file=sys.stderr)
+                errors.append(f"slides {batch[0]}-{batch[-1]}: {result['error']}")
+            replied = parse_summaries(result["content"])
+            summaries.update((slide, replied[slide]) for slide in batch if slide in replied)
+        pending = [(slide, tokens) for slide, tokens in pending if slide not in summaries]
+        if not pending:
+            break
+
+    if pending:
+        missing = ", ".join(str(slide) for slide, _ in pending)
+        raise RuntimeError(f"No summary for slides {missing}" + "".join(f"\n  {error}" for error in errors))
+
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text("\n".join(f"{slide}. {summaries[slide]}" for slide in sorted(summaries)) + "\n")
+    return output
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv(REPO_ROOT / ".env", override=True)
+
+    parser = argparse.ArgumentParser(description="Outline slides with one-sentence summaries, batching slides per vision request")
+    parser.add_argument("images_dir", help="Slide images (prefer the downscaled slide_images_llm directory)")
+    parser.add_argument("output_path", help="Where to write outline.txt")
+    parser.add_argument("--slide-text", help="slide_ascii.json or slide_ascii.md with the extracted text of each slide")
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=DEFAULT_TOKEN_BUDGET,
+        help=f"Estimated input tokens per request; slides are packed into requests up to this size (default: {DEFAULT_TOKEN_BUDGET})",
+    )
+    parser.add_argument(
+        "--max-per-batch",
+        type=int,
+        default=DEFAULT_MAX_SLIDES_PER_BATCH,
+        help=f"Maximum slides per request (default: {DEFAULT_MAX_SLIDES_PER_BATCH})",
+    )
+    parser.add_argument(
+        "--detail",
+        choices=["low", "high"],
+        default="high",
+        help="Image detail level sent to the model (default: high)",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum requests at once (default: 4)")
+    args = parser.parse_args()
+
+    try:
+        output = asyncio.run(outline_slides(
+            args.images_dir,
+            args.slide_text,
+            args.output_path,
+            args.token_budget,
+            args.max_per_batch,
+            args.detail,
+            args.concurrency,
+        ))
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Outline saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,26 @@ generate-writeup prompt and the target presentation.md as agent instructions.
 The agent follows the pipeline step by step using shell, file, and directory
 tools, and has access to individual skills from .github/skills/ via a
 FileAgentSkillsProvider.
+
+With --chunked, the write-up step instead runs as one small LLM request per
+slide, each given only that slide's text and transcript window, and the
+results are assembled into writeup.md in slide order.
 """
 
+import argparse
 import asyncio
+import hashlib
+import json
 import os
+import random
 import re
 import sys
+from itertools import islice
 from pathlib import Path
 from typing import Annotated
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
+import openai
 from agent_framework import Agent, FileAgentSkillsProvider, tool
 from agent_framework.openai import OpenAIChatClient
 from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
@@ -24,6 +35,33 @@ load_dotenv(override=True)
 
 SKILLS_DIR = Path(__file__).parent / ".github" / "skills"
 PROMPT_FILE = Path(__file__).parent / ".github" / "prompts" / "generate-writeup.prompt.md"
+WRITEUP_SKILL_FILE = SKILLS_DIR / "generate-presentation-writeup" / "SKILL.md"
+
+sys.path.insert(0, str(SKILLS_DIR / "align-slides"))
+sys.path.insert(0, str(SKILLS_DIR / "extract-transcript"))
+from align_slides import align_slides, load_slides  # noqa: E402
+from transcript_index import TranscriptIndex, format_timestamp  # noqa: E402
+
+# Transcript context given to each slide, even if the slide was only on screen briefly
+MIN_SLIDE_WINDOW_SECONDS = 30
+SKIP_MARKER = "SKIP"
+NO_QA_MARKER = "NONE"
+# Attempts per write-up request before giving up, with jittered exponential backoff between them
+MAX_REQUEST_ATTEMPTS = 5
+
+
+def is_transient_error(error: BaseException | None) -> bool:
+    """Whether a failed request is worth retrying: a rate limit, timeout, connection error, or server error.
+
+    The chat client wraps the OpenAI error it got, so the whole exception chain is checked.
+    """
+    while error is not None:
+        if isinstance(
+            error, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError, TimeoutError)
+        ):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
 
 
 def load_prompt() -> str:
@@ -56,25 +94,91 @@ async def run_shell(command: Annotated[str, "Shell command to execute"]) -> str:
     return result
 
 
-@tool(description="Read the contents of a file. Returns the full text content.")
-def read_file(path: Annotated[str, "File path relative to the workspace or absolute"]) -> str:
-    """Read a file and return its contents."""
+# Digest of what read_file last returned for each (path, range, grep) request in this session
+_read_cache: dict[tuple, str] = {}
+
+
+@tool(
+    description=(
+        "Read a text file. Returns the full content unless a line range, byte range, or grep pattern is given. "
+        "Partial reads end with a note of which lines or bytes were returned. "
+        "Repeating a read whose result has not changed returns 'unchanged since last read'; pass force=true to get the content again."
+    )
+)
+def read_file(
+    path: Annotated[str, "File path relative to the workspace or absolute"],
+    start_line: Annotated[int | None, "First line to return, counting from 1"] = None,
+    end_line: Annotated[int | None, "Last line to return, inclusive"] = None,
+    start_byte: Annotated[int | None, "Byte offset to start reading at (cannot be combined with lines)"] = None,
+    max_bytes: Annotated[int | None, "Maximum bytes to return (cannot be combined with lines)"] = None,
+    grep: Annotated[str | None, "Case-insensitive regex; return only matching lines, prefixed with their line numbers"] = None,
+    force: Annotated[bool, "Return the content even if it is unchanged since the last read"] = False,
+) -> str:
+    """Read a file, or part of it, and return its contents."""
     file_path = Path(path)
     if not file_path.is_absolute():
         file_path = Path(__file__).parent / file_path
-    return file_path.read_text()
+
+    if start_byte is not None or max_bytes is not None:
+        if start_line is not None or end_line is not None or grep:
+            raise ValueError("A byte range cannot be combined with a line range or grep")
+        size = file_path.stat().st_size
+        start = min(start_byte or 0, size)
+        end = size if max_bytes is None else min(size, start + max_bytes)
+        with file_path.open("rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        # A range can cut a multi-byte character in half, so drop partial characters at the edges
+        result = data.decode(errors="ignore")
+        if start > 0 or end < size:
+            result += f"\n[bytes {start}-{end} of {size}]"
+    elif start_line is not None or end_line is not None or grep:
+        # Only the requested lines are kept in memory; the rest are just counted
+        first = max(start_line or 1, 1)
+        with file_path.open() as f:
+            skipped = sum(1 for _ in islice(f, first - 1))
+            count = None if end_line is None else max(end_line - first + 1, 0)
+            lines = [line.rstrip("\r\n") for line in islice(f, count)]
+            total = skipped + len(lines) + sum(1 for _ in f)
+        last = first + len(lines) - 1
+        if first > max(total, 1):
+            result = f"start_line {first} is beyond the end of the file ({total} lines)"
+        elif end_line is not None and end_line < first:
+            result = f"end_line {end_line} is before start_line {first}"
+        elif grep:
+            pattern = re.compile(grep, re.IGNORECASE)
+            matches = [f"{n}: {line}" for n, line in enumerate(lines, start=first) if pattern.search(line)]
+            result = "\n".join(matches) + f"\n[{len(matches)} matching lines in lines {first}-{last} of {total}]"
+        elif first > 1 or last < total:
+            result = "\n".join(lines) + f"\n[lines {first}-{last} of {total}]"
+        else:
+            result = "\n".join(lines)
+    else:
+        result = file_path.read_text()
+
+    key = (str(file_path.resolve()), start_line, end_line, start_byte, max_bytes, grep)
+    digest = hashlib.sha256(result.encode()).hexdigest()
+    if not force and _read_cache.get(key) == digest:
+        return f"{path}: unchanged since last read"
+    _read_cache[key] = digest
+    return result
 
 
-@tool(description="Write content to a file. Creates parent directories if needed.")
+@tool(description="Write content to a file, or append it with append=true. Creates parent directories if needed.")
 def write_file(
     path: Annotated[str, "File path relative to the workspace or absolute"],
     content: Annotated[str, "Content to write to the file"],
+    append: Annotated[bool, "Add the content to the end of the file instead of replacing it"] = False,
 ) -> str:
-    """Write content to a file."""
+    """Write or append content to a file."""
     file_path = Path(path)
     if not file_path.is_absolute():
         file_path = Path(__file__).parent / file_path
     file_path.parent.mkdir(parents=True, exist_ok=True)
+    if append:
+        with file_path.open("a") as f:
+            f.write(content)
+        return f"Appended {len(content)} characters to {file_path}"
     file_path.write_text(content)
     return f"Wrote {len(content)} characters to {file_path}"
 
@@ -103,14 +207,287 @@ def path_exists(path: Annotated[str, "File or directory path relative to the wor
     return str(file_path.exists())
 
 
+# --- Chunked write-up generation ---
+
+
+def resolve_folder(presentation_folder: str) -> Path:
+    folder = Path(presentation_folder)
+    if not folder.is_absolute():
+        folder = Path(__file__).parent / folder
+    return folder
+
+
+def load_presentation(folder: Path) -> dict:
+    """Read the title, video, slides, and transcript fields from presentation.md or presentation.yaml."""
+    yaml_path = folder / "presentation.yaml"
+    if yaml_path.exists():
+        import yaml
+
+        data = yaml.safe_load(yaml_path.read_text()) or {}
+        return {key: str(data[key]) if data.get(key) else None for key in ("title", "date", "video", "slides", "transcript")}
+
+    text = (folder / "presentation.md").read_text()
+    info: dict[str, str | None] = {key: None for key in ("title", "date", "video", "slides", "transcript")}
+    title = re.search(r"^# (.+)$", text, re.MULTILINE)
+    if title:
+        info["title"] = title.group(1).strip()
+    for key in ("date", "video", "slides", "transcript"):
+        match = re.search(rf"^[-*\s]*\**{key}\**:\**\s*(.+)$", text, re.MULTILINE | re.IGNORECASE)
+        if match:
+            info[key] = match.group(1).strip()
+    if not info["video"]:
+        url = re.search(r"https://(?:www\.)?(?:youtube\.com|youtu\.be)/\S+", text)
+        info["video"] = url.group(0) if url else None
+    return info
+
+
+def load_writing_guidelines() -> str:
+    """Return the heading and writing rules from the generate-presentation-writeup skill.
+
+    The structure rules for the whole document are left out; the chunked
+    writer assembles the document itself.
+    """
+    text = WRITEUP_SKILL_FILE.read_text()
+    capitalization = re.search(r"^HEADING CAPITALIZATION:.*?(?=^Example structure:)", text, re.MULTILINE | re.DOTALL)
+    guidelines = re.search(r"^WRITING GUIDELINES:.*?(?=^### )", text, re.MULTILINE | re.DOTALL)
+    return "\n".join(match.group(0).strip() for match in (capitalization, guidelines) if match)
+
+
+def timestamp_link(video: str | None, seconds: float) -> str:
+    """A [Watch from MM:SS](url&t=Ns) link for YouTube videos, or a bare [MM:SS] for local files."""
+    timestamp = format_timestamp(seconds)
+    if video and video.startswith("http"):
+        # Replace any start time already in the URL, such as &t=3s
+        parsed = urlparse(video)
+        query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True) if key != "t"]
+        query.append(("t", f"{int(seconds)}s"))
+        url = urlunparse(parsed._replace(query=urlencode(query)))
+        return f"[Watch from {timestamp.strip('[]')}]({url})"
+    return timestamp
+
+
+def heading_anchor(heading: str) -> str:
+    anchor = re.sub(r"[^a-z0-9 -]", "", heading.lower()).replace(" ", "-")
+    return re.sub(r"-+", "-", anchor)
+
+
+def insert_table_of_contents(markdown: str) -> str:
+    """Insert a table of contents of all ## headings before the first one."""
+    headings = re.findall(r"^## (.+)$", markdown, re.MULTILINE)
+    if not headings:
+        return markdown
+    toc = "## Table of contents\n\n" + "\n".join(f"- [{h}](#{heading_anchor(h)})" for h in headings) + "\n\n"
+    first = re.search(r"^## ", markdown, re.MULTILINE).start()
+    return markdown[:first] + toc + markdown[first:]
+
+
+def load_section_headings(outputs: Path, num_slides: int) -> list[bool] | None:
+    """Which slides are RevealJS SECTION HEADING slides, if slides_content.md lines up with the PDF pages."""
+    content_path = outputs / "slides_content.md"
+    if not content_path.exists():
+        return None
+    kinds = re.findall(r"^## (Slide|SECTION HEADING) \d+$", content_path.read_text(), re.MULTILINE)
+    if len(kinds) != num_slides or "SECTION HEADING" not in kinds:
+        return None
+    return [kind == "SECTION HEADING" for kind in kinds]
+
+
+def slide_prompt(
+    guidelines: str,
+    title: str,
+    number: int,
+    heading_level: int,
+    image: str,
+    link: str,
+    slide_text: str,
+    links: list[str],
+    outline: str | None,
+    transcript: str,
+) -> str:
+    prompt = (
+        f"{guidelines}\n\n"
+        f'You are writing one section of an annotated write-up of the talk "{title}": the section for slide {number}.\n'
+        "Reply with only that section, in exactly this format:\n\n"
+        f"{'#' * heading_level} <heading>\n\n![<alt text>]({image})\n{link}\n\n<explanatory text>\n\n"
+        f"If the slide has nothing to explain (a title slide, or a blank or purely decorative slide), reply with only {SKIP_MARKER}.\n\n"
+        f"SLIDE_TEXT (ground truth for what the slide says):\n```\n{slide_text or '(no extractable text)'}\n```\n"
+    )
+    if links:
+        prompt += "SLIDE_LINKS:\n" + "\n".join(f"- {url}" for url in links) + "\n"
+    if outline:
+        prompt += f"SLIDE_SUMMARY: {outline}\n"
+    prompt += f"\nTRANSCRIPT while this slide was on screen:\n{transcript}\n"
+    return prompt
+
+
+def ensure_timestamp_link(section: str, link: str) -> str:
+    """Put the timestamp link under the slide image if the model left it out."""
+    if link in section:
+        return section
+    lines = section.split("\n")
+    position = next((i + 1 for i, line in enumerate(lines) if line.startswith("![")), 1)
+    lines.insert(position, link)
+    return "\n".join(lines)
+
+
+async def generate_chunked_writeup(
+    client: OpenAIChatClient,
+    presentation_folder: str,
+    concurrency: int = 4,
+    semaphore: asyncio.Semaphore | None = None,
+) -> Path:
+    """Generate writeup.md with one LLM request per slide, plus one each for the intro and Q&A.
+
+    Needs slide_ascii.json (or slide_ascii.md) in the outputs folder, and the
+    transcript the presentation lists or else outputs/transcript.txt. alignment.json is computed locally if it is missing or
+    has a different number of slides; outline.txt, chapters.txt, and
+    slides_content.md are used if present. At most `concurrency` requests run
+    at once, or pass a semaphore to share one request limit with other work.
+    Requests that fail with a rate limit, timeout, connection or server error
+    are retried with backoff; other errors are raised right away.
+    """
+    folder = resolve_folder(presentation_folder)
+    outputs = folder / "outputs"
+    info = load_presentation(folder)
+    slide_text_path = outputs / "slide_ascii.json"
+    if not slide_text_path.exists():
+        slide_text_path = outputs / "slide_ascii.md"
+    # A transcript listed in presentation.md/.yaml takes the place of the fetched one
+    transcript_path = folder / info["transcript"] if info["transcript"] else outputs / "transcript.txt"
+    for path in (slide_text_path, transcript_path):
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found. Run the pipeline steps that produce it first.")
+
+    slides = load_slides(slide_text_path)
+    slide_info = json.loads(slide_text_path.read_text())["slides"] if slide_text_path.suffix == ".json" else []
+    index = TranscriptIndex.load(transcript_path)
+    alignment_path = outputs / "alignment.json"
+    alignment = json.loads(alignment_path.read_text())["slides"] if alignment_path.exists() else []
+    if len(alignment) != len(slides):
+        # Missing, or left over from an older version of the deck
+        alignment = align_slides(slides, index)
+        alignment_path.write_text(json.dumps({"slides": alignment}, indent=2) + "\n")
+
+    outline_path = outputs / "outline.txt"
+    outline = {}
+    if outline_path.exists():
+        for line in outline_path.read_text().splitlines():
+            match = re.match(r"^(\d+)\.\s*(.+)$", line.strip())
+            if match:
+                outline[int(match.group(1))] = match.group(2)
+    chapters_path = outputs / "chapters.txt"
+    chapters = chapters_path.read_text() if chapters_path.exists() else ""
+    section_headings = load_section_headings(outputs, len(slides))
+    guidelines = load_writing_guidelines()
+    title = info["title"] or folder.name
+
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+
+    async def complete(prompt: str) -> str:
+        # Retry transient failures (rate limits, timeouts) so one bad request does not lose the whole write-up
+        for attempt in range(MAX_REQUEST_ATTEMPTS):
+            try:
+                async with semaphore:
+                    response = await client.get_response(prompt)
+                return response.text.strip()
+            except Exception as e:
+                if attempt == MAX_REQUEST_ATTEMPTS - 1 or not is_transient_error(e):
+                    raise
+                delay = min(60.0, 2**attempt) * random.uniform(0.5, 1.5)
+                print(f"Request failed ({e}), retrying in {delay:.0f}s", file=sys.stderr)
+                await asyncio.sleep(delay)
+
+    async def write_slide(number: int) -> str | None:
+        entry = alignment[number - 1]
+        start = entry["start"]
+        end = max(entry["end"], start + MIN_SLIDE_WINDOW_SECONDS)
+        details = slide_info[number - 1] if slide_info else {}
+        heading_level = 3 if section_headings and not section_headings[number - 1] else 2
+        link = timestamp_link(info["video"], start)
+        section = await complete(slide_prompt(
+            guidelines,
+            title,
+            number,
+            heading_level,
+            details.get("image", f"slide_images/slide_{number}.png"),
+            link,
+            slides[number - 1],
+            [link_info["url"] for link_info in details.get("links", [])],
+            outline.get(number),
+            index.format(index.between(start, end)),
+        ))
+        if section == SKIP_MARKER:
+            return None
+        return ensure_timestamp_link(section, link)
+
+    async def write_intro() -> str:
+        return await complete(
+            f"{guidelines}\n\n"
+            f'Write the opening of an annotated write-up of the talk "{title}". Reply with only a level-1 heading (#) '
+            "with the talk title in sentence case, a blank line, and one overview paragraph introducing the talk.\n\n"
+            f"VIDEO_CHAPTERS:\n{chapters}\n\nSLIDE_OUTLINE:\n"
+            + "\n".join(f"{n}. {summary}" for n, summary in sorted(outline.items()))
+        )
+
+    async def write_qa() -> str | None:
+        # Questions usually come after the last slide; the chapters help find any asked earlier
+        qa_start = alignment[-1]["end"] if alignment else 0.0
+        transcript = index.format(index.between(qa_start, float("inf")))
+        answer = await complete(
+            f"{guidelines}\n\n"
+            f'Write the Q&A section of an annotated write-up of the talk "{title}". Reply with a "## Q&A" heading '
+            "followed by each audience question as a level-3 heading (###) with its answer below it. "
+            f"If no audience questions were asked, reply with only {NO_QA_MARKER}.\n\n"
+            f"VIDEO_CHAPTERS:\n{chapters}\n\nTRANSCRIPT after the last slide:\n{transcript}\n"
+        )
+        return None if answer == NO_QA_MARKER else answer
+
+    intro, qa, *sections = await asyncio.gather(
+        write_intro(), write_qa(), *(write_slide(n) for n in range(1, len(slides) + 1))
+    )
+    parts = [intro, *(section for section in sections if section)]
+    if qa:
+        parts.append(qa)
+    writeup_path = outputs / "writeup.md"
+    writeup_path.write_text(insert_table_of_contents("\n\n".join(parts)) + "\n")
+    return writeup_path
+
+
+def create_chat_client() -> OpenAIChatClient:
+    """Create the Azure OpenAI chat client, authenticated with DefaultAzureCredential."""
+    async_credential = DefaultAzureCredential()
+    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
+    return OpenAIChatClient(
+        base_url=f"{os.environ['AZURE_OPENAI_ENDPOINT']}/openai/v1/",
+        api_key=token_provider,
+        model_id=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
+    )
+
+
 async def main() -> None:
     """Run the write-up generation agent."""
-    if len(sys.argv) < 2:
-        print("Usage: python agent_skills.py <presentation_folder>")
-        print("Example: python agent_skills.py presentations/python-agents-session3")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Generate an annotated write-up for a presentation folder")
+    parser.add_argument("presentation_folder", help="e.g. presentations/python-agents-session3")
+    parser.add_argument(
+        "--chunked",
+        action="store_true",
+        help="Generate writeup.md from per-slide requests, using the outputs of the earlier pipeline steps",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum LLM requests at once in --chunked mode (default: 4)",
+    )
+    args = parser.parse_args()
 
-    presentation_folder = sys.argv[1]
+    presentation_folder = args.presentation_folder
+    client = create_chat_client()
+
+    if args.chunked:
+        writeup_path = await generate_chunked_writeup(client, presentation_folder, args.concurrency)
+        print(f"Write-up saved to: {writeup_path}")
+        return
 
     # --- 1. Load prompt and presentation metadata ---
     prompt_instructions = load_prompt()
@@ -119,25 +496,18 @@ async def main() -> None:
         presentation_md_path = Path(__file__).parent / presentation_md_path
     presentation_md = presentation_md_path.read_text()
 
-    # --- 2. Create the chat client ---
-    async_credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(async_credential, "https://cognitiveservices.azure.com/.default")
-    client = OpenAIChatClient(
-        base_url=f"{os.environ['AZURE_OPENAI_ENDPOINT']}/openai/v1/",
-        api_key=token_provider,
-        model_id=os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"],
-    )
-
-    # --- 3. Create the skills provider ---
+    # --- 2. Create the skills provider ---
     skills_provider = FileAgentSkillsProvider(skill_paths=str(SKILLS_DIR))
 
-    # --- 4. Build agent instructions from prompt + presentation metadata ---
+    # --- 3. Build agent instructions from prompt + presentation metadata ---
     instructions = (
         f"{prompt_instructions}\n\n"
         f"## Presentation folder\n\n`{presentation_folder}`\n\n"
         f"## presentation.md contents\n\n{presentation_md}\n\n"
         "The workspace root is the current directory. "
         "Use cached outputs when they exist to avoid re-generating them. "
+        "Read long files such as transcript.txt in line ranges or with grep rather than in full, "
+        "and build writeup.md section by section with append. "
         "Follow the pipeline steps in order."
     )
 
@@ -1,33 +1,114 @@
 """
 Azure OpenAI client setup using Azure Identity for authentication.
+
+The client and its credential are created once per process and reused (the
+async client, once per event loop, with an async credential).
+Chat completions are cached on disk, keyed by the request, so re-running a
+step on unchanged input does not pay for the same tokens again. Many
+requests can be sent at once with chat_completions_batch.
 """
 
+import asyncio
+import hashlib
+import json
 import os
+import random
+import tempfile
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator
+from pathlib import Path
 
 import azure.identity
+import azure.identity.aio
 import openai
 
+RESPONSE_CACHE_DIR = Path.home() / ".cache" / "presentation-writeups" / "responses"
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+API_VERSION = "2024-10-21"
+DEFAULT_MAX_RETRIES = 6
+
+_token_provider = None
+_client: openai.AzureOpenAI | None = None
+# Async clients and their credentials hold connections bound to an event loop, so there is one of each per
+# loop, stored with the generator that closes them (see _close_when_loop_ends)
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+
+
+def get_token_provider():
+    """Return the shared bearer token provider, backed by one DefaultAzureCredential."""
+    global _token_provider
+    with _client_lock:
+        if _token_provider is None:
+            _token_provider = azure.identity.get_bearer_token_provider(
+                azure.identity.DefaultAzureCredential(),
+                "https://cognitiveservices.azure.com/.default"
+            )
+    return _token_provider
 
-def get_client() -> openai.OpenAI:
+
+def get_client() -> openai.AzureOpenAI:
     """
-    Create an Azure OpenAI client using DefaultAzureCredential.
-    
+    Return the shared Azure OpenAI client, creating it (and its DefaultAzureCredential) on first use.
+
     Requires environment variables:
     - AZURE_OPENAI_ENDPOINT: The Azure OpenAI endpoint URL
     - AZURE_OPENAI_CHAT_DEPLOYMENT: The deployment name for chat completions
     """
-    token_provider = azure.identity.get_bearer_token_provider(
-        azure.identity.DefaultAzureCredential(),
-        "https://cognitiveservices.azure.com/.default"
-    )
-    
-    client = openai.AzureOpenAI(
-        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
-        azure_ad_token_provider=token_provider,
-        api_version="2024-10-21",
-    )
-    
-    return client
+    global _client
+    token_provider = get_token_provider()
+    with _client_lock:
+        if _client is None:
+            _client = openai.AzureOpenAI(
+                azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+                azure_ad_token_provider=token_provider,
+                api_version=API_VERSION,
+            )
+    return _client
+
+
+async def _close_when_loop_ends(client: openai.AsyncAzureOpenAI, credential) -> AsyncIterator[None]:
+    """Close an async client and its credential when its event loop shuts down.
+
+    The loop tracks started async generators and closes them at shutdown
+    (asyncio.run calls loop.shutdown_asyncgens), which runs the finally block.
+    """
+    try:
+        yield
+    finally:
+        await client.close()
+        await credential.close()
+
+
+def get_async_client() -> openai.AsyncAzureOpenAI:
+    """
+    Return the async Azure OpenAI client for the running event loop.
+
+    It authenticates with its own async DefaultAzureCredential, so token
+    refreshes do not block the event loop. Its built-in retries are turned
+    off, since chat_completion_async does its own rate-limit-aware backoff.
+    The client and credential are closed when the loop ends.
+    """
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        if loop not in _async_clients:
+            credential = azure.identity.aio.DefaultAzureCredential()
+            client = openai.AsyncAzureOpenAI(
+                azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+                azure_ad_token_provider=azure.identity.aio.get_bearer_token_provider(
+                    credential, "https://cognitiveservices.azure.com/.default"
+                ),
+                api_version=API_VERSION,
+                max_retries=0,
+            )
+            closer = _close_when_loop_ends(client, credential)
+            # Start the generator so the loop registers it; it then waits at its yield until shutdown
+            loop.create_task(anext(closer))
+            _async_clients[loop] = (client, credential, closer)
+        return _async_clients[loop][0]
 
 
 def get_model_name() -> str:
@@ -35,30 +116,241 @@ def get_model_name() -> str:
     return os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT"]
 
 
+def cache_key(model: str, temperature: float, max_tokens: int, messages: list[dict]) -> str:
+    """Hash everything that determines a chat completion's response."""
+    request = {"model": model, "temperature": temperature, "max_tokens": max_tokens, "messages": messages}
+    return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of chat completion responses, one JSON file per request hash.
+
+    Entries older than ttl seconds (if set) are treated as missing. When the
+    cache grows past max_bytes, the least recently used entries are deleted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = RESPONSE_CACHE_DIR,
+        ttl: float | None = None,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # Running total of the cache size, so every write does not have to rescan the directory
+        self.size: int | None = None
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for key, or None if it is missing or expired."""
+        path = self.path(key)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None and time.time() - entry["created"] > self.ttl:
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return entry["content"]
+
+    def put(self, key: str, content: str, model: str) -> None:
+        """Store a response, writing to a temporary file first so readers never see a partial entry."""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"model": model, "created": time.time(), "content": content}, f)
+        os.replace(tmp_name, path)
+        if self.size is None:
+            self.evict()
+        else:
+            self.size += path.stat().st_size
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self.size = total
+
+
+_response_cache = ResponseCache()
+
+
 def chat_completion(
     messages: list[dict],
     temperature: float = 0.7,
     max_tokens: int = 8000,
+    use_cache: bool = True,
+    cache: ResponseCache | None = None,
 ) -> str:
     """
-    Send a chat completion request to Azure OpenAI.
-    
+    Send a chat completion request to Azure OpenAI, or return the cached response to an identical request.
+
     Args:
         messages: List of message dicts with 'role' and 'content'
         temperature: Sampling temperature
         max_tokens: Maximum tokens in response
-        
+        use_cache: Set to False to force a new response; it still replaces the cached one
+        cache: Response cache to use instead of the default one under ~/.cache
+
     Returns:
         The assistant's response text
     """
     client = get_client()
     model = get_model_name()
-    
+    cache = cache or _response_cache
+    key = cache_key(model, temperature, max_tokens, messages)
+
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
     response = client.chat.completions.create(
         model=model,
         temperature=temperature,
         max_tokens=max_tokens,
         messages=messages,
     )
-    
-    return response.choices[0].message.content
+
+    content = response.choices[0].message.content
+    if content is not None:
+        cache.put(key, content, model)
+    return content
+
+
+def retry_delay(error: openai.APIError, attempt: int) -> float:
+    """Seconds to wait before retrying: the server's Retry-After if it sent one, else exponential backoff."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            value = response.headers.get(header)
+            if value:
+                try:
+                    return float(value) * scale
+                except ValueError:
+                    pass
+    return min(60.0, 2**attempt) * random.uniform(0.5, 1.5)
+
+
+async def chat_completion_async(
+    messages: list[dict],
+    temperature: float = 0.7,
+    max_tokens: int = 8000,
+    use_cache: bool = True,
+    cache: ResponseCache | None = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> dict:
+    """
+    Async version of chat_completion that also reports usage.
+
+    Rate-limited (429) requests are retried after the Retry-After time the
+    service asks for; connection errors and server errors are retried with
+    exponential backoff.
+
+    Returns:
+        A dict with the response "content", "prompt_tokens", "completion_tokens",
+        "latency" (seconds, including retries), "retries", and "cached"
+    """
+    client = get_async_client()
+    model = get_model_name()
+    cache = cache or _response_cache
+    key = cache_key(model, temperature, max_tokens, messages)
+
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return {"content": cached, "prompt_tokens": 0, "completion_tokens": 0, "latency": 0.0, "retries": 0, "cached": True}
+
+    start = time.monotonic()
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                messages=messages,
+            )
+            break
+        except (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError) as e:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(retry_delay(e, attempt))
+
+    content = response.choices[0].message.content
+    if content is not None:
+        cache.put(key, content, model)
+    usage = response.usage
+    return {
+        "content": content,
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+        "latency": time.monotonic() - start,
+        "retries": attempt,
+        "cached": False,
+    }
+
+
+async def chat_completions_batch(
+    message_lists: list[list[dict]],
+    concurrency: int = 8,
+    temperature: float = 0.7,
+    max_tokens: int = 8000,
+    use_cache: bool = True,
+    semaphore: asyncio.Semaphore | None = None,
+) -> list[dict]:
+    """
+    Send many chat completion requests, at most `concurrency` at a time.
+
+    Args:
+        message_lists: One list of message dicts per request
+        concurrency: Maximum requests in flight at once
+        temperature: Sampling temperature for every request
+        max_tokens: Maximum tokens in each response
+        use_cache: Set to False to force new responses
+        semaphore: Shared semaphore to limit requests with, instead of `concurrency`
+
+    Returns:
+        One result per request, in input order, as returned by
+        chat_completion_async. A request that still fails after its retries
+        has "content" None and the failure in "error"; the others are unaffected.
+    """
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+
+    async def run(messages: list[dict]) -> dict:
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                result = await chat_completion_async(messages, temperature, max_tokens, use_cache)
+            except openai.OpenAIError as e:
+                return {
+                    "content": None,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "latency": time.monotonic() - start,
+                    "retries": None,
+                    "cached": False,
+                    "error": str(e),
+                }
+        result["error"] = None
+        return result
+
+    return await asyncio.gather(*(run(messages) for messages in message_lists))
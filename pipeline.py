@@ -0,0 +1,595 @@
+"""
+Pipeline runner for presentation write-ups.
+
+Runs the generate-presentation-writeup steps as an explicit graph of nodes
+instead of leaving the order to an agent. Each node declares the files it
+reads and writes; a node depends on whichever nodes produce its inputs, and
+independent nodes (fetching the transcript, rendering slides, extracting
+slide text) run at the same time. A node is re-run only when the content of
+its inputs or its parameters change, which is tracked per folder in
+outputs/pipeline_state.json. The LLM is only used for the chapters, outline,
+and write-up nodes.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from agent_framework.openai import OpenAIChatClient
+
+from agent_skills import (
+    SKILLS_DIR,
+    WRITEUP_SKILL_FILE,
+    create_chat_client,
+    generate_chunked_writeup,
+    load_presentation,
+    resolve_folder,
+)
+
+sys.path.insert(0, str(SKILLS_DIR / "outline-slides"))
+from outline_slides import outline_slides  # noqa: E402
+
+STATE_FILE = "pipeline_state.json"
+
+# Node resources: CPU nodes run a script and take worker slots; LLM nodes take an LLM slot per request
+CPU = "cpu"
+LLM = "llm"
+
+# pdftoppm processes rendering one deck; the slide_images node takes this many worker slots
+RENDER_JOBS = 4
+# LibreOffice workers in a grouped fetch-slides call, which takes this many worker slots
+FETCH_SOFFICE_WORKERS = 2
+
+# Node statuses reported after a run
+UP_TO_DATE = "up to date"
+ADOPTED = "adopted"
+RAN = "ran"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+# Folder outcomes reported after a batch run
+SKIPPED = "skipped"
+REBUILT = "rebuilt"
+
+
+class PipelineError(Exception):
+    """A pipeline node could not be built or failed to run."""
+
+
+class WorkerSlots:
+    """The worker limit shared by every CPU node, where one node may take several slots.
+
+    Multi-slot acquisitions are serialized by a lock, so two nodes can never
+    each hold part of what they need and wait on each other forever.
+    """
+
+    def __init__(self, count: int):
+        self.count = count
+        self.semaphore = asyncio.Semaphore(count)
+        self.lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def hold(self, slots: int = 1) -> AsyncIterator[None]:
+        slots = min(slots, self.count)
+        async with self.lock:
+            for _ in range(slots):
+                await self.semaphore.acquire()
+        try:
+            yield
+        finally:
+            for _ in range(slots):
+                self.semaphore.release()
+
+
+class Node:
+    """One pipeline step: an async action that turns input files into output files.
+
+    params are extra values (such as a URL) that should also re-run the node
+    when they change. after lists nodes that must finish first even though
+    none of their outputs are hashed inputs. slots is how many worker slots a
+    CPU node takes. A node with a batch_script can instead run together with
+    the same node of other folders: in a batch, all of their batch_args are
+    passed to one call of that script (see run_grouped).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        action: Callable[[], Awaitable[None]],
+        inputs: list[Path] = (),
+        outputs: list[Path] = (),
+        params: dict | None = None,
+        resource: str = CPU,
+        after: list[str] = (),
+        slots: int = 1,
+        batch_script: Path | None = None,
+        batch_args: list[str | Path] = (),
+    ):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.resource = resource
+        self.after = list(after)
+        self.slots = slots
+        self.batch_script = batch_script
+        self.batch_args = list(batch_args)
+
+
+def file_digest(path: Path) -> str | None:
+    """SHA-256 of a file's content, or None if it does not exist."""
+    if not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def node_key(node: Node) -> str:
+    """Hash of a node's parameters and the content of its inputs."""
+    payload = {
+        "params": node.params,
+        "inputs": {str(path): file_digest(path) for path in node.inputs},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class Pipeline:
+    """A graph of nodes for one presentation folder, with its saved state."""
+
+    def __init__(self, nodes: list[Node], state_path: Path):
+        self.nodes = {node.name: node for node in nodes}
+        self.state_path = state_path
+        self.state: dict[str, str] = json.loads(state_path.read_text()) if state_path.exists() else {}
+        # Nodes already run outside this pipeline, by a grouped call in a batch
+        self.ran_elsewhere: set[str] = set()
+
+        producers = {path: node.name for node in nodes for path in node.outputs}
+        self.deps = {
+            node.name: sorted({producers[path] for path in node.inputs if path in producers} | set(node.after))
+            for node in nodes
+        }
+        self.check_acyclic()
+
+    def check_acyclic(self) -> None:
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise PipelineError(f"Pipeline has a dependency cycle through {name}")
+            visiting.add(name)
+            for dep in self.deps[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+    def save_state(self) -> None:
+        """Write the state file atomically, so an interrupted run never leaves it half-written."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.state_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_name, self.state_path)
+
+    def needs_run(self, name: str, force: set[str] = frozenset()) -> bool:
+        """Whether a node is forced, lacks outputs, or has inputs that changed since it last ran."""
+        node = self.nodes[name]
+        if "all" in force or name in force or not all(path.exists() for path in node.outputs):
+            return True
+        return name in self.state and self.state[name] != node_key(node)
+
+    def record_ran(self, name: str) -> None:
+        """Record that a node was run outside this pipeline."""
+        self.state[name] = node_key(self.nodes[name])
+        self.ran_elsewhere.add(name)
+        self.save_state()
+
+    async def run(
+        self,
+        cpu_slots: WorkerSlots,
+        force: set[str] = frozenset(),
+        log: Callable[[str], None] = print,
+    ) -> dict[str, str]:
+        """Run every node whose inputs changed, as soon as its dependencies finish.
+
+        Outputs that exist from before the pipeline tracked them are adopted:
+        their key is recorded without re-running the node. Nodes named in
+        force (or all nodes, if force contains "all") always run. Returns the
+        status of each node.
+        """
+        statuses: dict[str, str] = {}
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_node(name: str) -> None:
+            node = self.nodes[name]
+            for dep in self.deps[name]:
+                await tasks[dep]
+            if any(statuses[dep] in (FAILED, BLOCKED) for dep in self.deps[name]):
+                statuses[name] = BLOCKED
+                return
+
+            if name in self.ran_elsewhere:
+                statuses[name] = RAN
+                return
+            key = node_key(node)
+            if not self.needs_run(name, force):
+                if name in self.state:
+                    statuses[name] = UP_TO_DATE
+                else:
+                    statuses[name] = ADOPTED
+                    self.state[name] = key
+                    self.save_state()
+                return
+
+            log(f"Running {name}...")
+            try:
+                if node.resource == CPU:
+                    async with cpu_slots.hold(node.slots):
+                        await node.action()
+                else:
+                    await node.action()
+            except Exception as e:
+                statuses[name] = FAILED
+                log(f"{name} failed: {e}")
+                return
+            statuses[name] = RAN
+            self.state[name] = key
+            self.save_state()
+
+        for name in self.nodes:
+            tasks[name] = asyncio.create_task(run_node(name))
+        await asyncio.gather(*tasks.values())
+        return {name: statuses[name] for name in self.nodes}
+
+
+async def run_script(script: Path, *args: str | Path) -> None:
+    """Run one of the skill scripts with uv, raising PipelineError if it fails."""
+    proc = await asyncio.create_subprocess_exec(
+        "uv", "run", str(script), *map(str, args),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=str(Path(__file__).parent),
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        output = (stderr or stdout).decode(errors="replace").strip().splitlines()
+        raise PipelineError(f"{script.name} exited with code {proc.returncode}: " + "\n".join(output[-20:]))
+
+
+async def complete(client: OpenAIChatClient, llm_slots: asyncio.Semaphore, prompt: str) -> str:
+    async with llm_slots:
+        response = await client.get_response(prompt)
+    return response.text.strip()
+
+
+async def write_chapters(client: OpenAIChatClient, llm_slots: asyncio.Semaphore, transcript: Path, output: Path) -> None:
+    chapters = await complete(client, llm_slots, (
+        "Here is the timestamped transcript of a talk. Write a brief summary paragraph (2-3 sentences) describing "
+        "what the video is about. Then, after a blank line, list timestamped chapters covering the main topics, "
+        'one per line in "MM:SS - Chapter Title" format. Reply with only the summary and the chapters.\n\n'
+        f"TRANSCRIPT:\n{transcript.read_text()}"
+    ))
+    output.write_text(chapters + "\n")
+
+
+def build_pipeline(
+    presentation_folder: str,
+    client: OpenAIChatClient,
+    llm_slots: asyncio.Semaphore,
+    render_jobs: int = RENDER_JOBS,
+) -> Pipeline:
+    """Build the node graph for one presentation folder from its presentation.md or presentation.yaml.
+
+    Every LLM request, including each vision request of the outline, takes a
+    slot from llm_slots. The slide_images node renders with render_jobs
+    pdftoppm processes and takes as many worker slots.
+    """
+    folder = resolve_folder(presentation_folder)
+    outputs = folder / "outputs"
+    info = load_presentation(folder)
+    if not info["slides"]:
+        raise PipelineError(f"{folder} does not list its slides")
+
+    nodes = []
+    slides = info["slides"]
+    if slides.startswith(("http://", "https://")):
+        pdf = outputs / "slides.pdf"
+        fetch_script = SKILLS_DIR / "fetch-slides" / "fetch_slides.py"
+        nodes.append(Node(
+            "fetch_slides",
+            lambda: run_script(fetch_script, slides, outputs),
+            outputs=[pdf],
+            params={"url": slides},
+            batch_script=fetch_script,
+            batch_args=[slides, outputs],
+        ))
+    else:
+        pdf = folder / slides
+        if pdf.suffix.lower() != ".pdf":
+            raise PipelineError(f"Local slides must be a PDF; fetch {slides} with the fetch-slides skill first")
+
+    if info["transcript"]:
+        transcript = folder / info["transcript"]
+    else:
+        transcript = outputs / "transcript.txt"
+        video = info["video"] or ""
+        if not video.startswith(("http://", "https://")):
+            raise PipelineError(f"{folder} has no transcript and no YouTube video to fetch one from")
+        transcript_script = SKILLS_DIR / "extract-transcript" / "extract_transcript.py"
+        nodes.append(Node(
+            "transcript",
+            lambda: run_script(transcript_script, video, transcript),
+            outputs=[transcript],
+            params={"video": video},
+            batch_script=transcript_script,
+            batch_args=[video, transcript],
+        ))
+
+    slide_images = outputs / "slide_images"
+    image_format = "png"
+    slide_images_llm = outputs / "slide_images_llm"
+    nodes.append(Node(
+        "slide_images",
+        lambda: run_script(
+            SKILLS_DIR / "convert-slides-to-images" / "convert_slides_to_images.py",
+            pdf, slide_images, "--format", image_format, "--jobs", str(render_jobs), "--llm-dir", slide_images_llm,
+        ),
+        inputs=[pdf],
+        outputs=[slide_images / "slide_1.png", slide_images_llm / "slide_fingerprints.json"],
+        slots=render_jobs,
+    ))
+
+    slide_ascii = outputs / "slide_ascii.md"
+    slide_ascii_json = outputs / "slide_ascii.json"
+    nodes.append(Node(
+        "slide_text",
+        # Told the image format up front, so it runs alongside the rendering instead of after it
+        lambda: run_script(
+            SKILLS_DIR / "extract-slide-text" / "extract_slide_text.py", pdf, slide_ascii, slide_images, image_format
+        ),
+        inputs=[pdf],
+        outputs=[slide_ascii, slide_ascii_json],
+    ))
+
+    alignment = outputs / "alignment.json"
+    frames_manifest = outputs / "video_frames" / "frames_manifest.md"
+    align_args = [slide_ascii_json, transcript, alignment]
+    if frames_manifest.exists():
+        align_args += ["--frames", frames_manifest]
+    nodes.append(Node(
+        "alignment",
+        lambda: run_script(SKILLS_DIR / "align-slides" / "align_slides.py", *align_args),
+        inputs=[slide_ascii_json, transcript, frames_manifest],
+        outputs=[alignment],
+    ))
+
+    chapters = outputs / "chapters.txt"
+    nodes.append(Node(
+        "chapters",
+        lambda: write_chapters(client, llm_slots, transcript, chapters),
+        inputs=[transcript],
+        outputs=[chapters],
+        resource=LLM,
+    ))
+
+    outline = outputs / "outline.txt"
+    nodes.append(Node(
+        "outline",
+        lambda: outline_slides(str(slide_images_llm), str(slide_ascii_json), str(outline), semaphore=llm_slots),
+        inputs=[slide_ascii_json, slide_images_llm / "slide_fingerprints.json"],
+        outputs=[outline],
+        resource=LLM,
+    ))
+
+    presentation_file = folder / ("presentation.yaml" if (folder / "presentation.yaml").exists() else "presentation.md")
+    nodes.append(Node(
+        "writeup",
+        lambda: generate_chunked_writeup(client, str(folder), semaphore=llm_slots),
+        inputs=[
+            presentation_file,
+            WRITEUP_SKILL_FILE,
+            slide_ascii_json,
+            transcript,
+            alignment,
+            outline,
+            chapters,
+            outputs / "slides_content.md",
+        ],
+        outputs=[outputs / "writeup.md"],
+        resource=LLM,
+    ))
+
+    return Pipeline(nodes, outputs / STATE_FILE)
+
+
+def discover_presentations(root: Path) -> list[Path]:
+    """Folders directly under root that have a presentation.md or presentation.yaml."""
+    return sorted(
+        folder for folder in root.iterdir()
+        if folder.is_dir() and ((folder / "presentation.md").exists() or (folder / "presentation.yaml").exists())
+    )
+
+
+async def run_grouped(
+    pipelines: list[tuple[Pipeline, Callable[[str], None]]],
+    cpu_slots: WorkerSlots,
+    force: set[str] = frozenset(),
+) -> None:
+    """Run each kind of batchable node that needs to run, across all folders, as one script call.
+
+    This way the fetch-slides call shares one browser, LibreOffice pool, and
+    cache, and the transcript call shares one YouTube session. Nodes whose
+    outputs the call wrote are recorded as run. The rest (for instance, if
+    the grouped call failed) are left for their own pipeline to run alone.
+    """
+    groups: dict[Path, list[tuple[Pipeline, Node, Callable[[str], None]]]] = {}
+    for pipeline, log in pipelines:
+        for name, node in pipeline.nodes.items():
+            if node.batch_script and not pipeline.deps[name] and pipeline.needs_run(name, force):
+                groups.setdefault(node.batch_script, []).append((pipeline, node, log))
+
+    async def run_group(script: Path, members: list[tuple[Pipeline, Node, Callable[[str], None]]]) -> None:
+        def modified() -> list[int | None]:
+            return [max((path.stat().st_mtime_ns for path in node.outputs if path.exists()), default=None)
+                    for _, node, _ in members]
+
+        before = modified()
+        args = [arg for _, node, _ in members for arg in node.batch_args]
+        slots = 1
+        if script.name == "fetch_slides.py":
+            slots = FETCH_SOFFICE_WORKERS
+            args += ["--soffice-workers", str(FETCH_SOFFICE_WORKERS)]
+        print(f"Running {script.name} for {len(members)} folders...")
+        try:
+            async with cpu_slots.hold(slots):
+                await run_script(script, *args)
+        except PipelineError as e:
+            print(f"Grouped {script.name} failed, running its folders one at a time: {e}")
+        for (pipeline, node, log), old, new in zip(members, before, modified()):
+            if new is not None and new != old and all(path.exists() for path in node.outputs):
+                pipeline.record_ran(node.name)
+                log(f"{node.name} ran in the grouped call")
+
+    await asyncio.gather(*(run_group(script, members) for script, members in groups.items()))
+
+
+def folder_outcome(statuses: dict[str, str]) -> str:
+    if any(status in (FAILED, BLOCKED) for status in statuses.values()):
+        return FAILED
+    if RAN in statuses.values():
+        return REBUILT
+    return SKIPPED
+
+
+async def run_batch(
+    folders: list[Path],
+    client: OpenAIChatClient,
+    cpu_slots: WorkerSlots,
+    llm_slots: asyncio.Semaphore,
+    force: set[str] = frozenset(),
+) -> dict[Path, tuple[str, str]]:
+    """Run the pipelines of many presentation folders at once, with one client and shared limits.
+
+    All folders draw from the same worker and LLM limits, so the limits
+    apply to the whole batch rather than to each folder. Slides and
+    transcripts are first fetched for all folders together (see run_grouped).
+    Returns (outcome, detail) per folder, where outcome is skipped (nothing
+    to do, or the folder cannot be processed), rebuilt, or failed.
+    """
+    results: dict[Path, tuple[str, str]] = {}
+    pipelines: dict[Path, Pipeline] = {}
+
+    def folder_log(folder: Path) -> Callable[[str], None]:
+        return lambda message: print(f"[{folder.name}] {message}")
+
+    for folder in folders:
+        try:
+            pipelines[folder] = build_pipeline(str(folder), client, llm_slots, min(RENDER_JOBS, cpu_slots.count))
+        except PipelineError as e:
+            # Folders the pipeline cannot handle (such as talks without slides) are not errors in a batch
+            results[folder] = (SKIPPED, str(e))
+        except OSError as e:
+            results[folder] = (FAILED, str(e))
+
+    await run_grouped([(pipeline, folder_log(folder)) for folder, pipeline in pipelines.items()], cpu_slots, force)
+
+    async def run_folder(folder: Path, pipeline: Pipeline) -> None:
+        statuses = await pipeline.run(cpu_slots, force, folder_log(folder))
+        outcome = folder_outcome(statuses)
+        if outcome == FAILED:
+            detail = ", ".join(f"{name} {status}" for name, status in statuses.items() if status in (FAILED, BLOCKED))
+        else:
+            detail = ", ".join(name for name, status in statuses.items() if status == RAN)
+        results[folder] = (outcome, detail)
+
+    await asyncio.gather(*(run_folder(folder, pipeline) for folder, pipeline in pipelines.items()))
+    return {folder: results[folder] for folder in folders}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the write-up pipeline for one or more presentation folders")
+    parser.add_argument(
+        "presentation_folders",
+        nargs="*",
+        metavar="presentation_folder",
+        help="e.g. presentations/python-agents-session3",
+    )
+    parser.add_argument(
+        "--all",
+        nargs="?",
+        const="presentations",
+        metavar="DIR",
+        help="Process every folder in DIR with a presentation.md or presentation.yaml (default DIR: presentations)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 4,
+        help="Maximum scripts (slide rendering, transcript fetching, ...) running at once, across all folders (default: CPU count)",
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=4,
+        help="Maximum LLM requests at once, across all folders (default: 4)",
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        metavar="NODE",
+        help="Re-run a node even if its inputs are unchanged; repeat for more nodes, or use 'all'",
+    )
+    args = parser.parse_args()
+
+    folders = [resolve_folder(folder) for folder in args.presentation_folders]
+    if args.all:
+        folders += discover_presentations(resolve_folder(args.all))
+    if not folders:
+        parser.error("give at least one presentation folder, or --all")
+
+    client = create_chat_client()
+    cpu_slots = WorkerSlots(args.workers)
+    llm_slots = asyncio.Semaphore(args.llm_concurrency)
+
+    if len(folders) == 1:
+        try:
+            pipeline = build_pipeline(str(folders[0]), client, llm_slots, min(RENDER_JOBS, args.workers))
+        except PipelineError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        statuses = await pipeline.run(cpu_slots, set(args.force))
+        for name, status in statuses.items():
+            print(f"{name:14s} {status}")
+        if FAILED in statuses.values():
+            sys.exit(1)
+        return
+
+    results = await run_batch(folders, client, cpu_slots, llm_slots, set(args.force))
+    print("\nSummary:")
+    for folder, (outcome, detail) in results.items():
+        print(f"{outcome:8s} {folder.name}" + (f" ({detail})" if detail else ""))
+    counts = {outcome: sum(result[0] == outcome for result in results.values()) for outcome in (SKIPPED, REBUILT, FAILED)}
+    print(f"\n{counts[REBUILT]} rebuilt, {counts[SKIPPED]} skipped, {counts[FAILED]} failed")
+    if counts[FAILED]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())